@@ -0,0 +1,227 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from library.classes import FootballSolution
+from library.compact import encode_population, evaluate_population
+from library.initialization import random_population, random_population_ids
+from library.selection import (tournament_selection, fitness_proportionate_selection,
+                               tournament_selection_indices, fitness_proportionate_selection_indices)
+from library.crossover import crossover_blockwise_teams, crossover_position_based
+from library.crossover2child import crossover_blockwise_teams_two_offspring, crossover_position_based_two_offspring
+from library.mutation import (mutate_global_position_permutation, mutate_random_position_swap, mutate_swap_between_teams,
+                              propose_global_position_permutation, propose_random_position_swap, propose_swap_between_teams)
+from library.GA import GeneticAlgorithm
+from library.local_search import hill_climb
+from library.synthetic import generate_players
+from library import fixed_para
+
+'''
+Benchmark suite: times every operator in isolation and complete GA runs at several scales.
+Every benchmark is seeded, calibrated to a minimum sample duration and repeated, and reports
+median / IQR of the time per call and ops/sec. Results are written as JSON so that two commits
+can be compared:
+
+    python -m benchmarks.run_benchmarks --output bench_new.json
+    python -m benchmarks.run_benchmarks --compare bench_old.json bench_new.json
+
+--scaling also times the operators on synthetic leagues of growing size (see library/synthetic.py).
+'''
+
+SEED = 2025
+
+
+def _seed(seed=SEED):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def measure(func, repeats=15, min_sample_time=0.02):
+    """
+    Times func() and returns stats of the time per call (seconds).
+    The number of calls per sample is calibrated so that each sample lasts at least min_sample_time.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+
+    q1, median, q3 = np.percentile(samples, [25, 50, 75])
+    return {"median": median, "q1": q1, "q3": q3, "iqr": q3 - q1, "ops_per_sec": 1 / median,
+            "loops": loops, "repeats": repeats}
+
+
+def operator_benchmarks(pop_size=40):
+    """
+    (name, function) pairs timing each operator alone on a fixed, seeded population.
+    """
+    _seed()
+    population = random_population(pop_size)
+    fitness = evaluate_population(encode_population(population))
+    p1, p2 = population[0], population[1]
+    for ind, fit in zip(population, fitness):
+        ind.set_evaluation(fit)
+
+    def uncached_fitness():
+        p1.invalidate()
+        return p1.fitness()
+
+    cube = encode_population(population)
+    return [
+        ("crossover/position_based", lambda: crossover_position_based(p1, p2)),
+        ("crossover/blockwise_teams", lambda: crossover_blockwise_teams(p1, p2)),
+        ("crossover2child/position_based_two_offspring", lambda: crossover_position_based_two_offspring(p1, p2)),
+        ("crossover2child/blockwise_teams_two_offspring", lambda: crossover_blockwise_teams_two_offspring(p1, p2)),
+        ("mutation/swap_between_teams", lambda: mutate_swap_between_teams(None, p1)),
+        ("mutation/global_position_permutation", lambda: mutate_global_position_permutation(None, p1)),
+        ("mutation/random_position_swap", lambda: mutate_random_position_swap(None, p1)),
+        ("mutation/propose_swap_between_teams", lambda: propose_swap_between_teams(p1)),
+        ("mutation/propose_global_position_permutation", lambda: propose_global_position_permutation(p1)),
+        ("mutation/propose_random_position_swap", lambda: propose_random_position_swap(p1)),
+        ("selection/tournament", lambda: tournament_selection(population)),
+        ("selection/fitness_proportionate", lambda: fitness_proportionate_selection(population)),
+        ("selection/tournament_indices_batch", lambda: tournament_selection_indices(fitness, 2 * pop_size)),
+        ("selection/fitness_proportionate_indices_batch",
+         lambda: fitness_proportionate_selection_indices(fitness, 2 * pop_size)),
+        ("fitness/scalar_uncached", uncached_fitness),
+        ("fitness/scalar_cached", p1.fitness),
+        ("fitness/batch_population", lambda: evaluate_population(cube)),
+        ("initialization/random_population", lambda: random_population(pop_size)),
+        ("initialization/random_population_ids", lambda: random_population_ids(pop_size)),
+    ]
+
+
+def ga_benchmarks(scales):
+    """
+    (name, function) pairs timing complete seeded GA runs for each (pop_size, generations).
+    """
+    benchmarks = []
+    for pop_size, generations in scales:
+        for label, crossover, two_children in [("1child", crossover_position_based, False),
+                                               ("2child", crossover_blockwise_teams_two_offspring, True)]:
+            ga = GeneticAlgorithm(tournament_selection, crossover, mutate_swap_between_teams, two_children,
+                                  generations=generations, pop_size=pop_size)
+            benchmarks.append((f"ga/{label}/pop{pop_size}_gen{generations}", lambda ga=ga: ga.run(seed=SEED)))
+    return benchmarks
+
+
+def scaling_benchmarks(sizes, pop_size=20):
+    """
+    Times the operators on synthetic leagues of each (n_teams, pool surplus) size.
+    Returns {size label: {benchmark: stats}}; the problem and dataset are restored afterwards.
+    """
+    results = {}
+    original = fixed_para.problem()
+    try:
+        for n_teams, surplus in sizes:
+            fixed_para.set_problem(n_teams=n_teams)
+            fixed_para.use_players_df(generate_players(surplus=surplus, seed=SEED))
+            _seed()
+            population = random_population(pop_size)
+            cube = encode_population(population)
+            p1, p2 = population[0], population[1]
+            label = f"teams{n_teams}_pool{surplus}x"
+            results[label] = {}
+            for name, func in [
+                ("initialization/random_population", lambda: random_population(pop_size)),
+                ("fitness/batch_population", lambda: evaluate_population(cube)),
+                ("crossover/position_based", lambda: crossover_position_based(p1, p2)),
+                ("crossover/blockwise_teams", lambda: crossover_blockwise_teams(p1, p2)),
+                ("crossover2child/position_based_two_offspring", lambda: crossover_position_based_two_offspring(p1, p2)),
+                ("crossover2child/blockwise_teams_two_offspring", lambda: crossover_blockwise_teams_two_offspring(p1, p2)),
+                ("mutation/swap_between_teams", lambda: mutate_swap_between_teams(None, p1)),
+                ("mutation/global_position_permutation", lambda: mutate_global_position_permutation(None, p1)),
+                ("mutation/random_position_swap", lambda: mutate_random_position_swap(None, p1)),
+                ("local_search/hill_climb_200_neighbours", lambda: hill_climb(p1, neighbours=200, max_moves=10)),
+            ]:
+                _seed()
+                stats = results[label][name] = measure(func, repeats=3, min_sample_time=0.01)
+                print(f"{label:<22} {name:<48} median {stats['median'] * 1e6:>12.1f} us")
+    finally:
+        fixed_para.set_problem(**original)
+        fixed_para.use_players_df(None)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(quick=False, filter_text=None, scaling=False):
+    scales = [(20, 10), (40, 25)] if quick else [(20, 50), (40, 100), (80, 100), (160, 100)]
+    repeats = 5 if quick else 15
+    results = {}
+    for name, func in operator_benchmarks() + ga_benchmarks(scales):
+        if filter_text and filter_text not in name:
+            continue
+        _seed()
+        is_ga = name.startswith("ga/")
+        results[name] = measure(func, repeats=3 if is_ga else repeats, min_sample_time=0 if is_ga else 0.02)
+        print(f"{name:<55} median {results[name]['median'] * 1e6:>12.1f} us   "
+              f"IQR {results[name]['iqr'] * 1e6:>10.1f} us   {results[name]['ops_per_sec']:>12.1f} ops/s")
+    report = {
+        "commit": _git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "seed": SEED,
+        "quick": quick,
+        "results": results,
+    }
+    if scaling:
+        sizes = [(5, 1), (50, 10), (200, 10)] if quick else [(5, 1), (50, 1), (50, 10), (200, 10), (1000, 10)]
+        report["scaling"] = scaling_benchmarks(sizes)
+    return report
+
+
+def compare(old_path, new_path):
+    """
+    Prints the median time ratio new/old of every benchmark present in both files.
+    """
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)["results"]
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+    for name in sorted(set(old) & set(new)):
+        ratio = new[name]["median"] / old[name]["median"]
+        print(f"{name:<55} {old[name]['median'] * 1e6:>12.1f} us -> {new[name]['median'] * 1e6:>12.1f} us   x{ratio:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the GA operators and complete GA runs")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file for the results")
+    parser.add_argument("--quick", action="store_true", help="smaller GA scales and fewer repeats")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this text")
+    parser.add_argument("--scaling", action="store_true", help="also time the operators on synthetic large leagues")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        report = run_suite(args.quick, args.filter, args.scaling)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved in '{args.output}'")
@@ -5,7 +5,8 @@ from library.crossover2child import crossover_blockwise_teams_two_offspring, cro
 
 from library.mutation import mutate_global_position_permutation, mutate_random_position_swap, mutate_swap_between_teams
 from library.classes import FootballSolution, Team
-from library.GA import run_ga_test_single_child, run_ga_test_two_children
+from library.GA import GeneticAlgorithm
+from library.termination import Stagnation
 
 import random
 import numpy as np
@@ -14,61 +15,23 @@ import csv
 import pandas as pd
 from itertools import product
 
-def run_ga_test_two_children_return_best(selection_func, crossover_func, mutation_func,
-                                         generations=100, pop_size=40, elitism=True,
-                                         crossover_prob=0.9, mutation_prob=0.1):
-    """
-    runs a GA and returns the best solution found (with the best combination found on grid search and the one that peaked 
-    earlier).
-    """
-    from copy import deepcopy
-    import random
-
-    population = [FootballSolution() for _ in range(pop_size)]
-
-    for gen in range(generations):
-        new_population = []
-
-        if elitism:
-            elite = deepcopy(max(population, key=lambda ind: ind.fitness()))
-            new_population.append(elite)
-
-        while len(new_population) < pop_size:
-            p1 = selection_func(population)
-            p2 = selection_func(population)
-
-            # Crossover (two children)
-            if random.random() < crossover_prob:
-                child1, child2 = crossover_func(p1, p2)
-            else:
-                child1, child2 = deepcopy(p1), deepcopy(p2)
-
-            # Mutation on both
-            if random.random() < mutation_prob:
-                child1 = mutation_func(None, child1)
-            if random.random() < mutation_prob:
-                child2 = mutation_func(None, child2)
-
-            for child in [child1, child2]:
-                if len(new_population) < pop_size:
-                    new_population.append(child)
-
-        population = new_population
-
-    # Return the best individual from the final population
-    best_solution = max(population, key=lambda ind: ind.fitness())
-    return best_solution
-
-best_solution = run_ga_test_two_children_return_best(
+#the best combination found on grid search and the one that peaked earlier,
+#with a hill-climbing step on the best league of every generation (it reaches the optimum in a few generations,
+#so the run stops once the best has not improved for 10 generations)
+ga = GeneticAlgorithm(
     selection_func=tournament_selection,
     crossover_func=crossover_blockwise_teams_two_offspring,
     mutation_func=mutate_global_position_permutation,
+    two_children=True,
     generations=50,
     pop_size=40,
     elitism=True,
     crossover_prob=0.9,
-    mutation_prob=0.1
+    mutation_prob=0.1,
+    local_search="best",
+    termination=[Stagnation(10)]
 )
+best_solution = ga.run().best
 
 print(best_solution)
 
@@ -1,107 +1,417 @@
 from library.classes import FootballSolution, Team
+from library.compact import encode_population, population_fitness
+from library.fitness_cache import FitnessCache, canonical_keys
+from library.initialization import random_population
+from library.selection import BATCH_SELECTION
+from library.mutation import INPLACE_MUTATION, apply_moves
+from library.profiling import GAProfiler, NULL_PROFILER, merge_profiles
+from library.termination import MAX_GENERATIONS
+from library.local_search import hill_climb
+from library.diversity import DiversityStats, population_diversity
+from library.shared_table import SharedPlayerTable, attach_player_table
 
+import os
 import random
+import time
 import numpy as np
 from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+from collections import namedtuple
 import csv
 import pandas as pd
 
-def run_ga_test_single_child(selection_func, crossover_func, mutation_func,
-                             generations=100, pop_size=40, elitism=True, n_runs=30,
-                             crossover_prob=0.9, mutation_prob=0.1): #default settings
+
+def run_seeds(seed, n_runs):
     """
-    Runs a GA test assuming crossover produces a single child.
+    Returns one deterministic seed per run derived from `seed` (None gives fresh random seeds).
     """
-    from copy import deepcopy
-    import random
-
-    all_runs_best_per_gen = []
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n_runs)]
 
-    for run in range(n_runs): #loop for runs
-        population = [FootballSolution() for _ in range(pop_size)]
-        best_per_gen = []
 
-        for gen in range(generations):
-            new_population = []
+def _seed_run(seed):
+    #every run owns its random state, so results don't depend on which worker ran it
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
 
-            if elitism:
-                elite = deepcopy(max(population, key=lambda ind: ind.fitness()))
-                new_population.append(elite)
 
-            while len(new_population) < pop_size:
-                p1 = selection_func(population)
-                p2 = selection_func(population)
+def _resolve_n_jobs(n_jobs):
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs) #-1 means all cores, -2 all but one...
+    return n_jobs
 
-                # Crossover (single child)
-                if random.random() < crossover_prob:
-                    child = crossover_func(p1, p2)
-                else:
-                    child = deepcopy(p1)
 
-                # Mutation
-                if random.random() < mutation_prob:
-                    child = mutation_func(None, child)
+def _run_all(run_func, n_runs, seed, n_jobs, executor):
+    """
+    Runs `run_func(run_seed, run_id)` for run_id in range(n_runs), sequentially or on a process pool,
+    and returns the results in run order.
+    """
+    n_jobs = _resolve_n_jobs(n_jobs)
+    if executor is None and n_jobs == 1:
+        seeds = [None] * n_runs if seed is None else run_seeds(seed, n_runs)
+        return [run_func(run_seed, run_id) for run_id, run_seed in enumerate(seeds)]
 
-                new_population.append(child)
+    #parallel workers would share the parent's random state, so each run always gets its own seed
+    seeds = run_seeds(seed, n_runs)
+    if executor is not None:
+        futures = [executor.submit(run_func, run_seed, run_id) for run_id, run_seed in enumerate(seeds)]
+        return [f.result() for f in futures]
+    #the workers attach to one shared copy of the player table instead of loading the dataset each
+    with SharedPlayerTable() as shared, ProcessPoolExecutor(max_workers=min(n_jobs, n_runs),
+                                                            initializer=attach_player_table,
+                                                            initargs=(shared.handle,)) as pool:
+        futures = [pool.submit(run_func, run_seed, run_id) for run_id, run_seed in enumerate(seeds)]
+        return [f.result() for f in futures]
 
-            population = new_population
-            best_gen_fitness = max(ind.fitness() for ind in population)
-            best_per_gen.append(best_gen_fitness)
 
-        all_runs_best_per_gen.append(best_per_gen)
+# result of one GA run: best fitness of each generation, best individual found and its fitness,
+# the GAProfiler of the run when profiling is on, the reason the run stopped (see termination.py) and,
+# with track_diversity, the DiversityStats of each generation (see diversity.py); adaptive runs also report
+# how often each operator was applied per generation (see adaptive.py)
+GAResult = namedtuple("GAResult", ["history", "best", "best_fitness", "profile", "stop_reason", "diversity",
+                                   "operators"],
+                      defaults=(None, MAX_GENERATIONS, None, None))
 
-    return all_runs_best_per_gen # Returns a list of length n_runs, where each element is a list of the best fitness value
-# found in each generation (i.e. an n_runs × generations matrix of max fitness scores)
+# per-generation record streamed while a run is in progress:
+# best / mean / std of the population fitness, diversity (fraction of distinct fitness values, a cheap proxy),
+# wall time of the generation and cumulative number of fitness evaluations; with track_diversity also the
+# genotypic diversity of the population (mean pairwise distance, team-mate entropy, unique ratio, see diversity.py)
+GenerationRecord = namedtuple("GenerationRecord",
+                              ["run", "generation", "best", "mean", "std", "diversity", "seconds", "evaluations",
+                               "distance", "entropy", "unique"],
+                              defaults=(None, None, None))
 
 
-def run_ga_test_two_children(selection_func, crossover_func, mutation_func,
-                             generations=100, pop_size=40, elitism=True, n_runs=30,
-                             crossover_prob=0.9, mutation_prob=0.1): #defauts
+class GeneticAlgorithm:
     """
-    Runs a GA test assuming crossover produces two children.
+    Configurable GA: selection -> crossover -> mutation -> replacement, with optional elitism.
+    The same loop handles 1-child and 2-children crossovers (two_children=True for the latter).
+    Operators are plain functions (same signatures as in selection.py, crossover*.py and mutation.py);
+    the steps are methods so they can also be overridden in a subclass.
+    This is the single place where batching, caching and parallelism are applied.
+    With profile=True every run also records phase timings and counters (see profiling.py).
+    Every callback in `callbacks` is called with the GenerationRecord of each generation as soon as it is done
+    (e.g. the recorders of streaming.py, which append them to disk); iter_generations() exposes the same stream.
+    `termination` policies (see termination.py) can end a run before `generations`.
+    With cache_size > 0 fitness is memoized per run by canonical league form in an LRU cache of that size
+    (record.evaluations then counts real evaluations only); dedup=True replaces clones in each new
+    generation (same league up to team / player order) with fresh random individuals.
+    local_search="best" or "first" adds a memetic step (see local_search.py): after each evaluation the best
+    individual (local_search_target="elite") or every individual ("offspring") is hill-climbed, with at most
+    local_search_moves improving swaps each; the neighbours it evaluates count as evaluations.
+    track_diversity=True adds the genotypic diversity of every generation to its record and to GAResult.diversity.
     """
-    from copy import deepcopy
-    import random
+    def __init__(self, selection_func, crossover_func, mutation_func, two_children=False,
+                 generations=100, pop_size=40, elitism=True,
+                 crossover_prob=0.9, mutation_prob=0.1, init_method="random", profile=False,
+                 callbacks=(), termination=(), cache_size=0, dedup=False,
+                 local_search=None, local_search_target="elite", local_search_moves=None, track_diversity=False):
+        self.selection_func = selection_func
+        self.crossover_func = crossover_func
+        self.mutation_func = mutation_func
+        self.two_children = two_children
+        self.generations = generations
+        self.pop_size = pop_size
+        self.elitism = elitism
+        self.crossover_prob = crossover_prob
+        self.mutation_prob = mutation_prob
+        self.init_method = init_method
+        self.profile = profile
+        self.callbacks = list(callbacks)
+        self.termination = list(termination)
+        self.cache_size = cache_size
+        self.dedup = dedup
+        self.cache = None #FitnessCache of the run in progress
+        if local_search_target not in ("elite", "offspring"):
+            raise ValueError(f"unknown local search target: {local_search_target}")
+        self.local_search = local_search
+        self.local_search_target = local_search_target
+        self.local_search_moves = local_search_moves
+        self.track_diversity = track_diversity
+        self.stop_reason = None #why the last run stopped
+        self._profiler = NULL_PROFILER
+
+    def initial_population(self):
+        return random_population(self.pop_size, method=self.init_method)
+
+    def evaluate(self, population):
+        #one vectorized evaluation per generation (it also fills every individual's fitness cache)
+        return population_fitness(population, cache=self.cache)
+
+    def deduplicate(self, population):
+        """
+        Replaces every clone of an earlier individual (same canonical form) with a fresh random individual.
+        The first occurrence is kept, so the elite always survives.
+        """
+        seen = set()
+        clones = []
+        for i, key in enumerate(canonical_keys(encode_population(population))):
+            if key in seen:
+                clones.append(i)
+            seen.add(key)
+        if clones:
+            self._profiler.count("clones_replaced", len(clones))
+            for i, fresh in zip(clones, random_population(len(clones), method=self.init_method)):
+                population[i] = fresh
+        return population
+
+    def select_parents(self, population, fitness, n_pairs):
+        """
+        Returns n_pairs (p1, p2) parent pairs. Known selection operators pick all the indices at once from the
+        fitness array and the parents are not copied (operators never modify their inputs); any other
+        selection function is called once per parent.
+        """
+        batch = BATCH_SELECTION.get(self.selection_func)
+        if batch is None:
+            return [(self.selection_func(population), self.selection_func(population)) for _ in range(n_pairs)]
+        idx = batch(fitness, 2 * n_pairs)
+        return [(population[i], population[j]) for i, j in idx.reshape(-1, 2)]
+
+    def crossover(self, p1, p2):
+        """
+        Returns the list of children of one pair (1 or 2 depending on the operator).
+        Without crossover the parents themselves go through (no copy needed).
+        """
+        if random.random() < self.crossover_prob:
+            return self.apply_crossover(self.crossover_func, p1, p2)
+        return [p1, p2] if self.two_children else [p1]
+
+    def apply_crossover(self, crossover_func, p1, p2):
+        children = crossover_func(p1, p2)
+        return list(children) if self.two_children else [children]
+
+    def mutate(self, child, shared=True):
+        """
+        Known mutation operators are applied in place as a small list of swaps: the child is only copied
+        when a move is actually applied and it is shared (a parent that went through without crossover).
+        Any other mutation function is called as before.
+        """
+        if random.random() >= self.mutation_prob:
+            return child
+        return self.apply_mutation(self.mutation_func, child, shared)
+
+    def apply_mutation(self, mutation_func, child, shared=True):
+        with self._profiler.phase("mutation"):
+            propose = INPLACE_MUTATION.get(mutation_func)
+            if propose is None:
+                return mutation_func(None, child)
+            moves = propose(child)
+            if not moves:
+                self._profiler.count("mutations_rejected")
+                return child
+            self._profiler.count("mutations_applied")
+            if shared:
+                child = child.copy()
+            apply_moves(child, moves)
+            return child
+
+    def next_generation(self, population, fitness):
+        profiler = self._profiler
+        new_population = []
+
+        if self.elitism:
+            with profiler.phase("elitism"):
+                #no copy needed: individuals are never modified in place
+                new_population.append(population[int(np.argmax(fitness))])
+
+        children_per_pair = 2 if self.two_children else 1
+        n_pairs = -(-(self.pop_size - len(new_population)) // children_per_pair)
+        with profiler.phase("selection"):
+            parents = self.select_parents(population, fitness, n_pairs)
+        for p1, p2 in parents:
+            with profiler.phase("crossover"):
+                children = self.crossover(p1, p2)
+            for child in children:
+                child = self.mutate(child, shared=child is p1 or child is p2)
+                if len(new_population) < self.pop_size:
+                    new_population.append(child)
+
+        return new_population
 
-    all_runs_best_per_gen = []
+    def refine(self, population, fitness):
+        """
+        Memetic step: hill-climbs the best individual or all of them, updating population and fitness in place.
+        Returns the number of neighbours evaluated.
+        """
+        if self.local_search_target == "elite":
+            targets = [int(np.argmax(fitness))]
+        else:
+            targets = range(len(population))
+        evaluations = 0
+        with self._profiler.phase("local_search"):
+            for i in targets:
+                result = hill_climb(population[i], self.local_search, self.local_search_moves)
+                evaluations += result.evaluations
+                if result.moves:
+                    self._profiler.count("local_search_moves", result.moves)
+                    population[i] = result.solution
+                    fitness[i] = result.solution.fitness()
+        return evaluations
 
-    for run in range(n_runs):
-        population = [FootballSolution() for _ in range(pop_size)]
-        best_per_gen = []
+    def _evaluate(self, population):
+        """
+        Returns the fitness array and the number of leagues actually evaluated (cache misses).
+        """
+        with self._profiler.phase("fitness"):
+            misses = self.cache.misses if self.cache is not None else 0
+            fitness = self.evaluate(population)
+            n = self.cache.misses - misses if self.cache is not None else len(population)
+            self._profiler.count("fitness_evaluations", n)
+        if self.local_search:
+            n += self.refine(population, fitness)
+        return fitness, n
 
-        for gen in range(generations):
-            new_population = []
+    def _record(self, run_id, gen, population, fitness, seconds, evaluations):
+        diversity = ()
+        if self.track_diversity:
+            with self._profiler.phase("diversity"):
+                diversity = population_diversity(population)
+        return GenerationRecord(run_id, gen, float(fitness.max()), float(fitness.mean()), float(fitness.std()),
+                                len(np.unique(fitness)) / len(fitness), seconds, evaluations, *diversity)
 
-            if elitism:
-                elite = deepcopy(max(population, key=lambda ind: ind.fitness()))
-                new_population.append(elite)
+    def _evolve(self, seed, run_id):
+        """
+        Generator behind run() and iter_generations(): yields (record, population, fitness) for the initial
+        population (record None) and then for every generation, calling the callbacks on the way.
+        Stops after `generations` or as soon as a termination policy triggers (reason in self.stop_reason).
+        """
+        _seed_run(seed)
+        self.stop_reason = MAX_GENERATIONS
+        for policy in self.termination:
+            policy.reset()
+        self.cache = FitnessCache(self.cache_size) if self.cache_size else None
+        self._profiler = profiler = GAProfiler(run_id) if self.profile else NULL_PROFILER
+        try:
+            with profiler.activate():
+                with profiler.phase("initialization"):
+                    population = self.initial_population()
+                fitness, evaluations = self._evaluate(population)
+                yield None, population, fitness
 
-            while len(new_population) < pop_size:
-                p1 = selection_func(population)
-                p2 = selection_func(population)
+                for gen in range(self.generations):
+                    start = time.perf_counter()
+                    profiler.start_generation(gen)
+                    population = self.next_generation(population, fitness)
+                    if self.dedup:
+                        population = self.deduplicate(population)
+                    fitness, n = self._evaluate(population)
+                    evaluations += n
 
-                # Crossover (two children)
-                if random.random() < crossover_prob:
-                    child1, child2 = crossover_func(p1, p2)
-                else:
-                    child1, child2 = deepcopy(p1), deepcopy(p2)
+                    record = self._record(run_id, gen, population, fitness, time.perf_counter() - start, evaluations)
+                    for callback in self.callbacks:
+                        callback(record)
+                    yield record, population, fitness
 
-                # Mutation on both
-                if random.random() < mutation_prob:
-                    child1 = mutation_func(None, child1)
-                if random.random() < mutation_prob:
-                    child2 = mutation_func(None, child2)
+                    reason = next((r for r in (policy.check(record) for policy in self.termination) if r), None)
+                    if reason is not None:
+                        self.stop_reason = reason
+                        break
+        finally:
+            self._profiler = NULL_PROFILER
 
-                for child in [child1, child2]:
-                    if len(new_population) < pop_size:
-                        new_population.append(child)
+    def iter_generations(self, seed=None, run_id=0):
+        """
+        Runs the GA lazily, yielding one GenerationRecord per generation (nothing else is kept in memory).
+        """
+        for record, population, fitness in self._evolve(seed, run_id):
+            if record is not None:
+                yield record
 
-            population = new_population
-            best_gen_fitness = max(ind.fitness() for ind in population)
-            best_per_gen.append(best_gen_fitness)
+    def run(self, seed=None, run_id=0):
+        """
+        One GA run. Returns a GAResult with the best fitness per generation and the best individual found.
+        """
+        history = []
+        diversity = []
+        best, best_fitness = None, -np.inf
+        for record, population, fitness in self._evolve(seed, run_id):
+            best_idx = int(np.argmax(fitness))
+            if fitness[best_idx] > best_fitness:
+                best, best_fitness = population[best_idx], fitness[best_idx]
+            if record is not None:
+                history.append(fitness[best_idx])
+                if self.track_diversity:
+                    diversity.append(DiversityStats(record.distance, record.entropy, record.unique))
+            profiler = self._profiler #the generator resets it once the run is over
 
-        all_runs_best_per_gen.append(best_per_gen) 
+        return GAResult(history, best, best_fitness, profiler if self.profile else None, self.stop_reason,
+                        diversity if self.track_diversity else None)
 
-    return all_runs_best_per_gen # Returns a list of length n_runs, where each element is a list of the best fitness value
-# found in each generation (i.e. an n_runs × generations matrix of max fitness scores)
+    def run_many(self, n_runs, n_jobs=1, seed=None, executor=None):
+        """
+        n_runs independent runs, sequentially or on a process pool (see run_ga_test_single_child).
+        Returns the list of GAResult in run order.
+        """
+        return _run_all(self.run, n_runs, seed, n_jobs, executor)
 
+
+def save_run_report(results, prefix):
+    """
+    Writes the fitness history of a list of GAResult to <prefix>_history.csv (one row per run) and,
+    when the runs were profiled, the merged profile to <prefix>_profile.json and <prefix>_profile.csv, and
+    when they tracked diversity, one row per (run, generation) to <prefix>_diversity.csv.
+    """
+    with open(f"{prefix}_history.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["run"] + [f"gen_{gen}" for gen in range(len(results[0].history))])
+        for run_id, result in enumerate(results):
+            writer.writerow([run_id] + [float(v) for v in result.history])
+    if results[0].diversity is not None:
+        with open(f"{prefix}_diversity.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["run", "generation"] + list(DiversityStats._fields))
+            for run_id, result in enumerate(results):
+                for gen, stats in enumerate(result.diversity):
+                    writer.writerow([run_id, gen] + list(stats))
+    profiles = [result.profile for result in results if result.profile is not None]
+    if profiles:
+        merged = merge_profiles(profiles)
+        merged.to_json(f"{prefix}_profile.json")
+        merged.to_csv(f"{prefix}_profile.csv")
+
+
+def run_ga(selection_func, crossover_func, mutation_func, two_children=False,
+           generations=100, pop_size=40, elitism=True,
+           crossover_prob=0.9, mutation_prob=0.1, seed=None, callbacks=(), termination=()):
+    """
+    Single GA run (the unit of work of the test functions and of the grid search).
+    Returns the list of the best fitness of each generation. If a termination policy stops the run early,
+    the last best fitness is carried forward so every run still has `generations` values.
+    """
+    history = GeneticAlgorithm(selection_func, crossover_func, mutation_func, two_children, generations, pop_size,
+                               elitism, crossover_prob, mutation_prob,
+                               callbacks=callbacks, termination=termination).run(seed).history
+    return history + history[-1:] * (generations - len(history))
+
+
+def run_ga_test_single_child(selection_func, crossover_func, mutation_func,
+                             generations=100, pop_size=40, elitism=True, n_runs=30,
+                             crossover_prob=0.9, mutation_prob=0.1,
+                             n_jobs=1, seed=None, executor=None): #default settings
+    """
+    Runs a GA test assuming crossover produces a single child.
+    The runs are independent: n_jobs > 1 (or -1 for all cores) spreads them over a process pool,
+    or an existing `executor` can be passed. With a `seed` every run gets a deterministic seed of its own.
+    """
+    ga = GeneticAlgorithm(selection_func, crossover_func, mutation_func, False, generations, pop_size,
+                          elitism, crossover_prob, mutation_prob)
+    # Returns a list of length n_runs, where each element is a list of the best fitness value
+    # found in each generation (i.e. an n_runs × generations matrix of max fitness scores)
+    return [result.history for result in ga.run_many(n_runs, n_jobs, seed, executor)]
+
+
+def run_ga_test_two_children(selection_func, crossover_func, mutation_func,
+                             generations=100, pop_size=40, elitism=True, n_runs=30,
+                             crossover_prob=0.9, mutation_prob=0.1,
+                             n_jobs=1, seed=None, executor=None): #defauts
+    """
+    Runs a GA test assuming crossover produces two children.
+    Same parallel options as run_ga_test_single_child.
+    """
+    ga = GeneticAlgorithm(selection_func, crossover_func, mutation_func, True, generations, pop_size,
+                          elitism, crossover_prob, mutation_prob)
+    # Returns a list of length n_runs, where each element is a list of the best fitness value
+    # found in each generation (i.e. an n_runs × generations matrix of max fitness scores)
+    return [result.history for result in ga.run_many(n_runs, n_jobs, seed, executor)]
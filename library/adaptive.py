@@ -0,0 +1,179 @@
+import math
+import random
+
+import numpy as np
+
+from library.GA import GeneticAlgorithm
+from library.crossover import crossover_blockwise_teams, crossover_position_based
+from library.mutation import mutate_global_position_permutation, mutate_random_position_swap, mutate_swap_between_teams
+
+'''
+Adaptive operator selection: instead of fixing one crossover and one mutation for a whole run (and finding
+the best pair offline with a grid of runs), every child picks its operators from a pool with a bandit that
+learns during the run which operators improve the population.
+The credit of an operator application is the fitness gain of the child over its best parent (0 when it is
+not better), normalized by the largest gain of the generation, so rewards don't depend on the fitness scale.
+Crossover and mutation have a bandit each; a child that is crossed and mutated credits both operators.
+ - ProbabilityMatching: each operator is picked with a probability proportional to its estimated reward
+   (exponential recency-weighted average of its mean reward per generation), never below p_min
+ - UCB: UCB1 on the mean reward of every application, the operator with the best upper confidence bound wins
+'''
+
+DEFAULT_CROSSOVERS = (crossover_blockwise_teams, crossover_position_based)
+DEFAULT_MUTATIONS = (mutate_swap_between_teams, mutate_global_position_permutation, mutate_random_position_swap)
+
+
+class ProbabilityMatching:
+    """
+    Probability matching over n_arms operators: p_i = p_min + (1 - n_arms * p_min) * q_i / sum(q),
+    with q_i += alpha * (mean reward of the generation - q_i) for the operators used in it.
+    """
+    def __init__(self, n_arms, p_min=0.05, alpha=0.3):
+        if not 0 <= p_min * n_arms < 1:
+            raise ValueError("p_min must be below 1 / n_arms")
+        self.p_min = p_min
+        self.alpha = alpha
+        self.quality = np.ones(n_arms) #optimistic start: every operator gets tried
+        self.probabilities = np.full(n_arms, 1 / n_arms)
+
+    def select(self):
+        return random.choices(range(len(self.quality)), weights=self.probabilities)[0]
+
+    def update(self, arms, rewards):
+        """
+        Learns from the (arm, reward) pairs of one generation.
+        """
+        if not len(arms):
+            return
+        n_arms = len(self.quality)
+        uses = np.bincount(arms, minlength=n_arms)
+        totals = np.bincount(arms, weights=rewards, minlength=n_arms)
+        used = uses > 0
+        self.quality[used] += self.alpha * (totals[used] / uses[used] - self.quality[used])
+        total = self.quality.sum()
+        share = self.quality / total if total > 0 else np.full(n_arms, 1 / n_arms)
+        self.probabilities = self.p_min + (1 - n_arms * self.p_min) * share
+
+
+class UCB:
+    """
+    UCB1: picks argmax mean_i + c * sqrt(2 ln(total uses) / uses_i), untried operators first.
+    Uses are counted when an operator is picked, so the operators rotate within a generation.
+    """
+    def __init__(self, n_arms, c=0.5):
+        self.c = c
+        self.uses = np.zeros(n_arms)
+        self.values = np.zeros(n_arms) #mean reward per operator
+        self._credited = np.zeros(n_arms) #applications already included in values
+
+    def select(self):
+        untried = np.flatnonzero(self.uses == 0)
+        if untried.size:
+            arm = int(untried[0])
+        else:
+            bonus = self.c * np.sqrt(2 * math.log(self.uses.sum()) / self.uses)
+            arm = int(np.argmax(self.values + bonus))
+        self.uses[arm] += 1
+        return arm
+
+    @property
+    def probabilities(self):
+        return self.uses / self.uses.sum() if self.uses.sum() else np.full(len(self.uses), 1 / len(self.uses))
+
+    def update(self, arms, rewards):
+        for arm, reward in zip(arms, rewards):
+            self._credited[arm] += 1
+            self.values[arm] += (reward - self.values[arm]) / self._credited[arm]
+
+
+BANDITS = {"probability_matching": ProbabilityMatching, "ucb": UCB}
+
+
+class AdaptiveGeneticAlgorithm(GeneticAlgorithm):
+    """
+    GeneticAlgorithm that chooses the crossover and the mutation of every child from `crossovers` and
+    `mutations` with a bandit (method "probability_matching" or "ucb", options in bandit_params).
+    The crossovers must all give 1 child, or all 2 with two_children=True. Every other option is passed to
+    GeneticAlgorithm. GAResult.operators holds, per generation, how many times each operator was applied.
+    """
+    def __init__(self, selection_func, crossovers=DEFAULT_CROSSOVERS, mutations=DEFAULT_MUTATIONS,
+                 two_children=False, method="probability_matching", bandit_params=None, **kwargs):
+        if method not in BANDITS:
+            raise ValueError(f"unknown adaptive method: {method}")
+        super().__init__(selection_func, crossovers[0], mutations[0], two_children, **kwargs)
+        self.crossovers = list(crossovers)
+        self.mutations = list(mutations)
+        self.method = method
+        self.bandit_params = dict(bandit_params or {})
+        self.crossover_bandit = None
+        self.mutation_bandit = None
+        self.operator_usage = [] #per generation: {operator name: applications}
+        self._parent_fitness = [] #fitness to beat for each child of the pair being made, in order
+        self._crossover_arm = None
+        self._bred = False #a new generation was made since the last evaluation
+        self._pending = [] #(child, crossover arm, mutation arm, parent fitness) of the generation being made
+
+    def crossover(self, p1, p2):
+        self._bred = True
+        self._crossover_arm = None
+        if random.random() < self.crossover_prob:
+            self._crossover_arm = self.crossover_bandit.select()
+            children = self.apply_crossover(self.crossovers[self._crossover_arm], p1, p2)
+            self._parent_fitness = [max(p1.fitness(), p2.fitness())] * len(children)
+            return children
+        #a parent that goes through is only compared with itself
+        children = [p1, p2] if self.two_children else [p1]
+        self._parent_fitness = [child.fitness() for child in children]
+        return children
+
+    def mutate(self, child, shared=True):
+        mutation_arm = None
+        parent_fitness = self._parent_fitness.pop(0)
+        if random.random() < self.mutation_prob:
+            mutation_arm = self.mutation_bandit.select()
+            child = self.apply_mutation(self.mutations[mutation_arm], child, shared)
+        if self._crossover_arm is not None or mutation_arm is not None:
+            self._pending.append((child, self._crossover_arm, mutation_arm, parent_fitness))
+        return child
+
+    def credit(self, population, fitness):
+        """
+        Rewards the operators that made the children of the new population, then forgets them.
+        """
+        position = {id(ind): i for i, ind in enumerate(population)}
+        pending = [(position[id(child)], cx, mut, parent) for child, cx, mut, parent in self._pending
+                   if id(child) in position] #children dropped by the replacement earn nothing
+        self._pending = []
+        gains = np.array([max(fitness[i] - parent, 0.0) for i, _, _, parent in pending])
+        rewards = gains / gains.max() if len(gains) and gains.max() > 0 else gains
+        usage = {}
+        for bandit, operators, slot in ((self.crossover_bandit, self.crossovers, 1),
+                                        (self.mutation_bandit, self.mutations, 2)):
+            used = [k for k, entry in enumerate(pending) if entry[slot] is not None]
+            arms = np.array([pending[k][slot] for k in used], dtype=np.intp)
+            bandit.update(arms, rewards[used])
+            counts = np.bincount(arms, minlength=len(operators))
+            usage.update({op.__name__: int(n) for op, n in zip(operators, counts)})
+        self.operator_usage.append(usage)
+
+    def evaluate(self, population):
+        #credit before the local search step, which replaces the children it improves with refined copies
+        fitness = super().evaluate(population)
+        if self._bred: #not for the initial population
+            self._bred = False
+            self.credit(population, fitness)
+        return fitness
+
+    def _evolve(self, seed, run_id):
+        #fresh bandits for every run
+        bandit = BANDITS[self.method]
+        self.crossover_bandit = bandit(len(self.crossovers), **self.bandit_params)
+        self.mutation_bandit = bandit(len(self.mutations), **self.bandit_params)
+        self.operator_usage = []
+        self._pending = []
+        self._bred = False
+        yield from super()._evolve(seed, run_id)
+
+    def run(self, seed=None, run_id=0):
+        result = super().run(seed, run_id)
+        return result._replace(operators=self.operator_usage)
@@ -3,7 +3,9 @@ from abc import ABC, abstractmethod
 import pandas as pd
 import numpy as np
 from copy import deepcopy
-from library.fixed_para import POSITIONS,TEAM_SIZE,TEAM_STRUCTURE,N_TEAMS, MAX_BUDGET,players_df
+from library import profiling
+from library import fixed_para
+from library.fixed_para import get_players_df
 
 class Solution(ABC):
     def __init__(self, repr=None):
@@ -43,11 +45,13 @@ class Team:
         return self.players[idx]
     
     def is_valid(self):
-        pos_count = {p: 0 for p in POSITIONS} #count players in each pos (start w/ 0)
+        pos_count = {p: 0 for p in fixed_para.POSITIONS} #count players in each pos (start w/ 0)
         #total_cost = 0
         for player in self.players:
+            if player['Position'] not in pos_count:
+                return False #position not used by the problem (see fixed_para.set_problem)
             pos_count[player['Position']] += 1 #when a player is seen sums to the count
-        if any(pos_count[p] != TEAM_STRUCTURE[p] for p in POSITIONS):
+        if any(pos_count[p] != fixed_para.TEAM_STRUCTURE[p] for p in fixed_para.POSITIONS):
             return False  #if any pos doesn't have exacly the right nº of players, its invalid
         return True
 
@@ -61,10 +65,72 @@ class Team:
     
 
 class FootballSolution(Solution):
-    def __init__(self, repr=None, players_df=players_df):
-        self.players_df = players_df
+    def __init__(self, repr=None, players_df=None):
+        #the dataset is loaded lazily, on the first solution created
+        self.players_df = players_df if players_df is not None else get_players_df()
         super().__init__(repr=repr)
+
+    #the representation is a property so that replacing it drops the cached fitness
+    @property
+    def repr(self):
+        return self._repr
+
+    @repr.setter
+    def repr(self, value):
+        self._repr = value
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Drops the cached fitness and team statistics. Must be called after editing self.repr in place
+        (other than through swap_players).
+        """
+        self._fitness = None
+        self._team_salaries = None
+        self._team_skill_sums = None
+
+    def set_evaluation(self, fitness, team_salaries=None, team_skill_sums=None):
+        """
+        Stores a fitness (and optionally the team sums) computed elsewhere, e.g. by a batch evaluator.
+        """
+        self._fitness = fitness
+        if team_salaries is not None and team_skill_sums is not None:
+            self._team_salaries = list(team_salaries)
+            self._team_skill_sums = list(team_skill_sums)
+
+    def copy(self):
+        """
+        Returns an independent copy of the solution (teams copied, player data and cached stats carried over)
+        without deep-copying players_df.
+        """
+        if profiling.ACTIVE is not None:
+            profiling.ACTIVE.count("copies")
+        new = self.__class__(repr=[Team(list(team.players)) for team in self.repr], players_df=self.players_df)
+        new._fitness = self._fitness
+        if self._team_salaries is not None:
+            new._team_salaries = list(self._team_salaries)
+            new._team_skill_sums = list(self._team_skill_sums)
+        return new
     
+    def __reduce_ex__(self, protocol):
+        #with the default dataset only the player ids (and the cached fitness) are pickled, not players_df;
+        #the receiving process decodes them with its own (or the shared) player table
+        if self.players_df is get_players_df():
+            from library.compact import table_for
+            table = table_for(self.players_df)
+            ids = np.stack([table.encode_team(team) for team in self.repr])
+            return (_solution_from_ids, (ids, self._fitness))
+        return super().__reduce_ex__(protocol)
+
+    def canonical_key(self):
+        """
+        Hashable key identical for every team order / player order of the same league (see fitness_cache.py).
+        """
+        from library.compact import table_for
+        from library.fitness_cache import canonical_key
+        table = table_for(self.players_df)
+        return canonical_key(np.stack([table.encode_team(team) for team in self.repr]))
+
     def __repr__(self):
         summary = f"\n===== FootballSolution =====\n"
         for idx, team in enumerate(self.repr, 1):
@@ -80,8 +146,8 @@ class FootballSolution(Solution):
     def _validate_repr(self, repr):
         if not isinstance(repr, list):
             raise TypeError("Representation must be a list of Team objects")
-        if len(repr) != N_TEAMS:
-            raise ValueError("There must be exactly 5 teams")
+        if len(repr) != fixed_para.N_TEAMS:
+            raise ValueError(f"There must be exactly {fixed_para.N_TEAMS} teams")
         for team in repr:
             if not isinstance(team, Team):
                 raise TypeError("Each element in the representation must be a Team")
@@ -90,63 +156,73 @@ class FootballSolution(Solution):
 
     
     def random_initial_representation(self):
-        all_players = self.players_df.to_dict('records')
-        random.shuffle(all_players)
-
-        # group players by their position
-        by_position = {pos: [] for pos in POSITIONS}
-        for p in all_players:
-            if p['Position'] in by_position:
-                by_position[p['Position']].append(p)
-        #shuffle each position group to randomize selection within positions
-        for pos_list in by_position.values():
-            random.shuffle(pos_list)
-
-        teams = []
-        used_names = set()
-
-        while len(teams) < N_TEAMS:
-            try:
-                team_players = []
-                #for each required position, select the needed number of available players
-                for pos, count in TEAM_STRUCTURE.items():
-                    #only not used players
-                    available = [p for p in by_position[pos] if p['Name'] not in used_names]
-                    if len(available) < count:
-                        raise ValueError(f"Not enough players left for position: {pos}") #extra verification
-                    team_players.extend(random.sample(available, count))
-
-                team = Team(team_players)
-
-                if team.is_valid():
-                    teams.append(team)
-                    #mark these players as used
-                    used_names.update(p['Name'] for p in team_players)
-
-            except Exception:
-                #if smth is wrong retry
-                continue
-
-        return teams
-
-    def fitness(self):
+        #players are drawn by the vectorized sampler (a permutation of each position pool),
+        #so the league is valid by construction and no retries are needed
+        from library.compact import table_for
+        from library.initialization import random_population_ids
+        table = table_for(self.players_df)
+        return [table.decode_team(ids) for ids in random_population_ids(1, table=table)[0]]
+
+    def _compute_team_stats(self):
         #ensure the representation is valid; otherwise, raise an error
         self._validate_repr(self.repr)  #let it raise ValueError naturally if invalid (layer of protection)
+        self._team_salaries = [team.total_salary() for team in self.repr]
+        self._team_skill_sums = [sum(p['Skill'] for p in team.players) for team in self.repr]
+
+    def fitness(self):
+        #fitness is memoized, it is only recomputed after the representation changes
+        if self._fitness is not None:
+            if profiling.ACTIVE is not None:
+                profiling.ACTIVE.count("fitness_cache_hits")
+            return self._fitness
+        if profiling.ACTIVE is not None:
+            profiling.ACTIVE.count("fitness_cache_misses")
+        if self._team_salaries is None:
+            self._compute_team_stats()
 
         #budget penalty
         penalty = 0
-        for team in self.repr:
-            excess = team.total_salary() - MAX_BUDGET
+        for salary in self._team_salaries:
+            excess = salary - fixed_para.MAX_BUDGET
             if excess > 0:
                 penalty += excess * 0.5  # weighted penalty
 
-        #balance metric
-        skills = [team.average_skill() for team in self.repr]
+        #balance metric (same values as team.average_skill(), kept as running sums so swaps are cheap)
+        skills = [total / len(team) for total, team in zip(self._team_skill_sums, self.repr)]
         base_score = 1 / (1 + np.std(skills))
 
-        return max(0.001, base_score - penalty)
-    
-
-
-    
-
+        self._fitness = max(0.001, base_score - penalty)
+        return self._fitness
+
+    def swap_players(self, t1, i1, t2, i2):
+        """
+        Swaps player i1 of team t1 with player i2 of team t2 in place.
+        When both play the same position only the two affected team sums are updated,
+        so the next fitness() call just redoes the penalty and the std over N_TEAMS averages.
+        """
+        team1, team2 = self.repr[t1], self.repr[t2]
+        p1, p2 = team1.players[i1], team2.players[i2]
+        team1.players[i1], team2.players[i2] = p2, p1
+
+        if self._team_salaries is None or p1['Position'] != p2['Position']:
+            #structure may have changed, the next evaluation validates everything again
+            self.invalidate()
+            return
+
+        salary_delta = p2['Salary (€M)'] - p1['Salary (€M)']
+        skill_delta = p2['Skill'] - p1['Skill']
+        self._team_salaries[t1] += salary_delta
+        self._team_salaries[t2] -= salary_delta
+        self._team_skill_sums[t1] += skill_delta
+        self._team_skill_sums[t2] -= skill_delta
+        self._fitness = None
+
+
+def _solution_from_ids(ids, fitness=None):
+    #unpickles a FootballSolution sent as player ids (see FootballSolution.__reduce_ex__)
+    from library.compact import get_player_table
+    table = get_player_table()
+    solution = FootballSolution([table.decode_team(team) for team in ids])
+    if fitness is not None:
+        solution.set_evaluation(fitness)
+    return solution
@@ -0,0 +1,420 @@
+import random
+import numpy as np
+import pandas as pd
+from library.classes import FootballSolution, Team
+from library import fixed_para
+from library.fixed_para import get_players_df, players_source
+from library.fitness_cache import canonical_key, canonical_keys
+from library import profiling
+
+'''
+Compact, array-backed alternative to the dict-based FootballSolution/Team representation.
+A league is stored as a NumPy int array of shape (N_TEAMS, TEAM_SIZE) holding row indices
+into a shared, read-only PlayerTable. Copying an individual only copies 35 small ints
+instead of every player dict, and it converts losslessly to and from the dict-based form.
+'''
+
+INDEX_DTYPE = np.int32
+UNUSED_POSITION = -1 #position code of the players whose position is not in the problem's TEAM_STRUCTURE
+
+
+def numpy_rng(seed=None):
+    """
+    NumPy generator for the vectorized operators. Without a seed it is seeded from `random`,
+    so random.seed() (used by the GA runs) keeps controlling every draw.
+    """
+    return np.random.default_rng(seed if seed is not None else random.getrandbits(64))
+
+
+def _read_only(arr):
+    arr.flags.writeable = False
+    return arr
+
+
+def position_codes(positions):
+    """
+    Index of every position in fixed_para.POSITIONS, UNUSED_POSITION for the positions the problem doesn't use
+    (such players are in the table but never in a league).
+    """
+    index = {pos: i for i, pos in enumerate(fixed_para.POSITIONS)}
+    return np.array([index.get(pos, UNUSED_POSITION) for pos in positions], dtype=np.int8)
+
+
+class PlayerTable:
+    """
+    Read-only table of player attributes shared by every compact solution.
+    Player ids are the row positions of players_df. Players of a position the problem doesn't use get the
+    code UNUSED_POSITION and are left out of position_ids.
+    """
+    __slots__ = ("_records", "names", "name_to_id", "position", "position_code", "skill", "salary", "position_ids",
+                 "positions")
+
+    def __init__(self, players_df):
+        #the original dict records are kept so decoding gives back exactly the same players
+        records = tuple(players_df.to_dict('records'))
+        self._init([p['Name'] for p in records], np.array([p['Position'] for p in records]),
+                   np.array([p['Skill'] for p in records], dtype=np.float64),
+                   np.array([p['Salary (€M)'] for p in records], dtype=np.float64))
+        self._records = records
+        for arr in (self.position, self.skill, self.salary):
+            _read_only(arr)
+
+    def _init(self, names, position, skill, salary, position_code=None):
+        self.positions = tuple(fixed_para.POSITIONS) #position codes index this tuple
+        self.names = tuple(str(name) for name in names)
+        self.name_to_id = {name: i for i, name in enumerate(self.names)}
+        if len(self.name_to_id) != len(self.names):
+            raise ValueError("Player names must be unique")
+        self.position = position
+        self.position_code = position_code if position_code is not None else _read_only(position_codes(position.tolist()))
+        self.skill = skill
+        self.salary = salary
+        self._records = None
+        #ids of the players of each position, in table order
+        self.position_ids = {pos: _read_only(np.flatnonzero(self.position_code == i).astype(INDEX_DTYPE))
+                             for i, pos in enumerate(self.positions)}
+
+    @classmethod
+    def from_arrays(cls, names, position, position_code, skill, salary):
+        """
+        Builds a table over existing arrays (e.g. views on a shared memory block, see shared_table.py)
+        without copying them. The player dicts are only built if dict-based decoding needs them (see records).
+        """
+        table = cls.__new__(cls)
+        table._init(names, position, skill, salary, position_code)
+        return table
+
+    @property
+    def records(self):
+        #player dicts (as in players_df), built on first use for a table made from arrays
+        if self._records is None:
+            self._records = tuple({'Name': name, 'Position': str(pos), 'Skill': float(s), 'Salary (€M)': float(c)}
+                                  for name, pos, s, c in zip(self.names, self.position, self.skill, self.salary))
+        return self._records
+
+    def __len__(self):
+        return len(self.names)
+
+    def __deepcopy__(self, memo):
+        #the table is immutable and shared, never copy it
+        return self
+
+    def to_frame(self):
+        """
+        players_df equivalent of the table (one row per player record).
+        """
+        return pd.DataFrame(list(self.records))
+
+    def encode_team(self, team):
+        return np.array([self.name_to_id[p['Name']] for p in team.players], dtype=INDEX_DTYPE)
+
+    def decode_team(self, ids):
+        return Team([self.records[i] for i in ids])
+
+
+_default_table = None
+_default_table_source = None
+
+
+def get_player_table():
+    """
+    Returns the module-level PlayerTable built from fixed_para.players_df: the shared player index
+    (name -> id, per-position id arrays, skill and salary vectors). Built once and then reused.
+    """
+    global _default_table, _default_table_source
+    source = players_source() #not built yet if it is installed lazily (see shared_table.py)
+    #rebuilt only if the dataset itself or the positions changed (see fixed_para.set_players_path / set_problem)
+    if _default_table is None or _default_table_source is not source or _default_table.positions != tuple(fixed_para.POSITIONS):
+        df = get_players_df()
+        _default_table = PlayerTable(df)
+        _default_table_source = df
+    return _default_table
+
+
+def set_default_table(table, players_df):
+    """
+    Makes `table` the shared table of the dataset `players_df`, or of the function installed to build it lazily
+    (used by the workers attached to a shared table).
+    """
+    global _default_table, _default_table_source
+    _default_table, _default_table_source = table, players_df
+
+
+def table_for(players_df):
+    """
+    The shared table if players_df is the default dataset, otherwise a new PlayerTable for it.
+    """
+    if players_df is _default_table_source or players_df is players_source():
+        return get_player_table()
+    return PlayerTable(players_df)
+
+
+class FreePlayerPool:
+    """
+    Players not used yet. A byte per player of the table marks the used ones, so creating a pool and taking
+    a player are O(1) whatever the size of the table. Random free players of a position are drawn by rejection
+    from the position's ids while at least half of them are free (at most 2 draws per player on average).
+    Past that point the position switches, once, to a list of its free players plus a slot index: taking a
+    player moves the last free one into its slot, so every later draw of k players is O(k).
+    """
+    __slots__ = ("table", "_used", "_n_used", "_free", "_slot")
+
+    def __init__(self, table=None):
+        self.table = table if table is not None else get_player_table()
+        self._used = bytearray(len(self.table))
+        self._n_used = dict.fromkeys(self.table.position_ids, 0)
+        self._free = {} #position -> list of its free players, once built
+        self._slot = {} #player -> index in its position's free list
+
+    def take(self, pid):
+        """
+        Marks a player as used. Returns False if it was already taken.
+        """
+        if self._used[pid]:
+            return False
+        self._used[pid] = 1
+        pos = self.table.positions[self.table.position_code[pid]]
+        self._n_used[pos] += 1
+        free = self._free.get(pos)
+        if free is not None:
+            slot = self._slot.pop(pid)
+            last = free.pop()
+            if last != pid:
+                #move the last free player into the freed slot
+                free[slot] = last
+                self._slot[last] = slot
+        return True
+
+    def is_free(self, pid):
+        return not self._used[pid]
+
+    def count(self, pos):
+        return len(self.table.position_ids[pos]) - self._n_used[pos]
+
+    def draw(self, pos, k):
+        """
+        Takes up to k random free players of a position and returns their ids.
+        """
+        ids = self.table.position_ids[pos]
+        k = min(k, self.count(pos))
+        free = self._free.get(pos)
+        if free is None and 2 * self.count(pos) >= len(ids):
+            drawn = []
+            while len(drawn) < k:
+                pid = int(ids[random.randrange(len(ids))])
+                if self.take(pid):
+                    drawn.append(pid)
+            return drawn
+        if free is None:
+            free = self._free[pos] = [pid for pid in ids.tolist() if not self._used[pid]]
+            self._slot.update((pid, slot) for slot, pid in enumerate(free))
+        drawn = random.sample(free, k)
+        for pid in drawn:
+            self.take(pid)
+        return drawn
+
+
+class CompactTeam:
+    """
+    Light view over one row of a CompactSolution, with the same helpers as Team.
+    """
+    __slots__ = ("ids", "table")
+
+    def __init__(self, ids, table=None):
+        self.ids = ids
+        self.table = table if table is not None else get_player_table()
+
+    def __repr__(self):
+        return repr(self.to_team())
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, idx):
+        return self.table.records[self.ids[idx]]
+
+    @property
+    def players(self):
+        return [self.table.records[i] for i in self.ids]
+
+    def is_valid(self):
+        counts = np.bincount(self.table.position_code[self.ids], minlength=len(fixed_para.POSITIONS))
+        return all(counts[i] == fixed_para.TEAM_STRUCTURE[pos] for i, pos in enumerate(fixed_para.POSITIONS))
+
+    def average_skill(self):
+        return np.mean(self.table.skill[self.ids])
+
+    def total_salary(self):
+        return self.table.salary[self.ids].sum()
+
+    def to_team(self):
+        return self.table.decode_team(self.ids)
+
+
+class CompactSolution:
+    """
+    League encoded as an (N_TEAMS, TEAM_SIZE) array of player ids into a PlayerTable.
+    Fitness is the same as FootballSolution.fitness(), computed over the table vectors.
+    """
+    __slots__ = ("idx", "table")
+
+    def __init__(self, idx, table=None):
+        idx = np.array(idx, dtype=INDEX_DTYPE)
+        if idx.shape != (fixed_para.N_TEAMS, fixed_para.TEAM_SIZE):
+            raise ValueError(f"Representation must have shape ({fixed_para.N_TEAMS}, {fixed_para.TEAM_SIZE})")
+        self.idx = idx
+        self.table = table if table is not None else get_player_table()
+
+    @classmethod
+    def from_solution(cls, solution, table=None):
+        table = table if table is not None else get_player_table()
+        return cls(np.stack([table.encode_team(team) for team in solution.repr]), table)
+
+    def to_solution(self):
+        return FootballSolution([self.table.decode_team(ids) for ids in self.idx])
+
+    def __repr__(self):
+        return repr(self.to_solution())
+
+    def __len__(self):
+        return len(self.idx)
+
+    def __getitem__(self, team_idx):
+        return CompactTeam(self.idx[team_idx], self.table)
+
+    @property
+    def repr(self):
+        return [CompactTeam(ids, self.table) for ids in self.idx]
+
+    def copy(self):
+        new = CompactSolution.__new__(CompactSolution)
+        new.idx = self.idx.copy()
+        new.table = self.table
+        return new
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __reduce__(self):
+        #only the ids travel when pickled, the default table is re-attached on load
+        if self.table is _default_table:
+            return (CompactSolution, (self.idx,))
+        return (CompactSolution, (self.idx, self.table))
+
+    def is_valid(self):
+        #no player repeated across the league and every team with the right structure
+        if len(np.unique(self.idx)) != self.idx.size:
+            return False
+        return all(team.is_valid() for team in self.repr)
+
+    def canonical_key(self):
+        #same key for every team / player order of the league (see fitness_cache.py)
+        return canonical_key(self.idx)
+
+    def fitness(self):
+        if not self.is_valid():
+            raise ValueError("Each team must be valid (positions and structure)")
+
+        #budget penalty
+        excess = self.table.salary[self.idx].sum(axis=1) - fixed_para.MAX_BUDGET
+        penalty = (excess[excess > 0] * 0.5).sum()
+
+        #balance metric
+        skills = self.table.skill[self.idx].mean(axis=1)
+        base_score = 1 / (1 + np.std(skills))
+
+        return max(0.001, base_score - penalty)
+
+
+def encode_population(population, table=None):
+    """
+    Stacks a population (FootballSolution or CompactSolution individuals) into a
+    (pop_size, N_TEAMS, TEAM_SIZE) array of player ids.
+    """
+    table = table if table is not None else get_player_table()
+    name_to_id = table.name_to_id
+    return np.array([ind.idx if isinstance(ind, CompactSolution) else
+                     [[name_to_id[p['Name']] for p in team.players] for team in ind.repr]
+                     for ind in population], dtype=INDEX_DTYPE)
+
+
+def _validate_population(cube, table):
+    #same checks as FootballSolution._validate_repr, for every league at once
+    if cube.ndim != 3 or cube.shape[1:] != (fixed_para.N_TEAMS, fixed_para.TEAM_SIZE):
+        raise ValueError(f"Population must have shape (pop_size, {fixed_para.N_TEAMS}, {fixed_para.TEAM_SIZE})")
+    required = np.array([fixed_para.TEAM_STRUCTURE[pos] for pos in fixed_para.POSITIONS])
+    counts = (table.position_code[cube][..., None] == np.arange(len(fixed_para.POSITIONS))).sum(axis=2)
+    if not (counts == required).all():
+        raise ValueError("Each team must be valid (positions and structure)")
+    flat = np.sort(cube.reshape(len(cube), -1), axis=1)
+    if (flat[:, 1:] == flat[:, :-1]).any():
+        raise ValueError("A player can only be in one team")
+
+
+def evaluate_population(cube, table=None, return_team_stats=False):
+    """
+    Fitness of every league of a (pop_size, N_TEAMS, TEAM_SIZE) id array in one NumPy pass.
+    Gives exactly the same values as FootballSolution.fitness() (same operations, in the same order).
+    With return_team_stats it also returns the (pop_size, N_TEAMS) team salaries and skill sums.
+    """
+    table = table if table is not None else get_player_table()
+    cube = np.asarray(cube)
+    _validate_population(cube, table)
+
+    salaries = table.salary[cube].sum(axis=2)
+    skill_sums = table.skill[cube].sum(axis=2)
+
+    #budget penalty
+    penalty = (np.maximum(salaries - fixed_para.MAX_BUDGET, 0) * 0.5).sum(axis=1)
+
+    #balance metric
+    base_score = 1 / (1 + np.std(skill_sums / fixed_para.TEAM_SIZE, axis=1))
+
+    fitness = np.maximum(0.001, base_score - penalty)
+    if return_team_stats:
+        return fitness, salaries, skill_sums
+    return fitness
+
+
+def population_fitness(population, table=None, cache=None):
+    """
+    Evaluates a list of solutions with evaluate_population and stores the results in each
+    FootballSolution's fitness cache, so later fitness() calls (selection, elitism) are free.
+    With a FitnessCache only the leagues whose canonical form was never seen are evaluated (clones inside
+    the population once), the others take the cached value.
+    Returns the fitness array, in population order.
+    """
+    cube = encode_population(population, table)
+    if cache is None:
+        fitness, salaries, skill_sums = evaluate_population(cube, table, return_team_stats=True)
+        for ind, fit, team_salaries, team_skill_sums in zip(population, fitness, salaries, skill_sums):
+            if isinstance(ind, FootballSolution):
+                ind.set_evaluation(fit, team_salaries.tolist(), team_skill_sums.tolist())
+        return fitness
+
+    keys = canonical_keys(cube)
+    #one lookup per distinct league, so cache.misses is exactly the number of leagues evaluated
+    known = {key: cache.get(key) for key in dict.fromkeys(keys)}
+    missing = {}
+    for i, key in enumerate(keys):
+        if known[key] is None and key not in missing:
+            missing[key] = i
+    if missing:
+        rows = list(missing.values())
+        new_fitness, salaries, skill_sums = evaluate_population(cube[rows], table, return_team_stats=True)
+        for key, i, fit, team_salaries, team_skill_sums in zip(missing, rows, new_fitness, salaries, skill_sums):
+            cache.put(key, fit)
+            known[key] = fit
+            if isinstance(population[i], FootballSolution):
+                population[i].set_evaluation(fit, team_salaries.tolist(), team_skill_sums.tolist())
+    profiling.count("fitness_lru_hits", len(keys) - len(missing))
+
+    fitness = np.array([known[key] for key in keys])
+    for ind, fit in zip(population, fitness):
+        if isinstance(ind, FootballSolution) and ind._fitness is None:
+            #the cache only keeps the fitness, team sums are recomputed if the league is mutated later
+            ind.set_evaluation(fit)
+    return fitness
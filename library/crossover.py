@@ -1,7 +1,7 @@
-from copy import deepcopy
 from collections import Counter
 from library.classes import FootballSolution, Team
-from library.fixed_para import POSITIONS, TEAM_STRUCTURE, N_TEAMS,TEAM_SIZE, players_df,MAX_BUDGET
+from library.compact import get_player_table, FreePlayerPool
+from library import fixed_para
 import random
 import numpy as np
 
@@ -13,17 +13,16 @@ def crossover_position_based(p1: FootballSolution, p2: FootballSolution) -> Foot
     If not enough valid players are available, it completes the team with available players from the global pool. This ensures that all offspring teams 
     are valid and structurally complete.
     """
-    expected_structure = {'GK': 1, 'DEF': 2, 'MID': 2, 'FWD': 2}
-    name_to_player = {p['Name']: p for _, p in players_df.iterrows()}
-    all_names = set(name_to_player.keys())
+    expected_structure = fixed_para.TEAM_STRUCTURE
+    table = get_player_table() #shared player index, built once
+    free = FreePlayerPool(table) #players not used yet, per position
     offspring_teams = []
-    used_names = set()  
 
-    for team_idx in range(N_TEAMS):
+    for team_idx in range(fixed_para.N_TEAMS):
         team_players = []
 
         # group by parents position
-        position_pool = {'GK': [], 'DEF': [], 'MID': [], 'FWD': []}
+        position_pool = {pos: [] for pos in expected_structure}
         for parent in [p1, p2]:
             for p in parent.repr[team_idx].players:
                 position_pool[p['Position']].append(p)
@@ -36,32 +35,24 @@ def crossover_position_based(p1: FootballSolution, p2: FootballSolution) -> Foot
 
             # trying from parents
             for p in pool:
-                if p['Name'] not in used_names:
+                if free.take(table.name_to_id[p['Name']]):
                     selected.append(p)
-                    used_names.add(p['Name'])
                     if len(selected) == n_needed:
                         break
 
             # if missing complete with free players 
             if len(selected) < n_needed:
-                available = [name_to_player[n] for n in all_names - used_names if name_to_player[n]['Position'] == pos]
-                random.shuffle(available)
-                for p in available:
-                    selected.append(p)
-                    used_names.add(p['Name'])
-                    if len(selected) == n_needed:
-                        break
+                selected.extend(table.records[pid] for pid in free.draw(pos, n_needed - len(selected)))
 
             if len(selected) < n_needed:
-                print(f"ERROR: Could not fill {n_needed} players in position {pos} for team {team_idx+1}")
-                raise SystemExit("Structure violation even after attempting to fill with available players.")
+                raise ValueError(f"Not enough players to fill {n_needed} {pos} slots in team {team_idx+1}")
 
             team_players.extend(selected)
 
         offspring_teams.append(Team(team_players))
         
 
-    return FootballSolution(offspring_teams, players_df)
+    return FootballSolution(offspring_teams)
 
 
 def crossover_blockwise_teams(p1: FootballSolution, p2: FootballSolution) -> FootballSolution:
@@ -71,49 +62,43 @@ def crossover_blockwise_teams(p1: FootballSolution, p2: FootballSolution) -> Foo
     duplicates with valid, available players from the global player pool. The operator ensures that all teams in the offspring maintain the required 
     structure and contain unique players.
     """
-    from copy import deepcopy
-
-    name_to_player = {p['Name']: p for _, p in players_df.iterrows()}
-    all_names = set(name_to_player.keys())
-    used_names = set()
+    table = get_player_table()
+    free = FreePlayerPool(table)
     offspring_teams = []
 
-    # randomly decide how many teams to take from p1 (e.g., 2 or 3)
-    n_from_p1 = random.randint(2, 3)
-    p1_indices = random.sample(range(N_TEAMS), n_from_p1)
-    p2_indices = [i for i in range(N_TEAMS) if i not in p1_indices]
+    # randomly decide how many teams to take from p1 (about half: 2 or 3 of 5)
+    n_teams = fixed_para.N_TEAMS
+    n_from_p1 = random.randint(n_teams // 2, (n_teams + 1) // 2)
+    p1_indices = random.sample(range(n_teams), n_from_p1)
+    chosen = set(p1_indices)
+    p2_indices = [i for i in range(n_teams) if i not in chosen]
 
 
-    # teams from p1
+    # teams from p1 (player records are shared and never modified, no need to copy them)
     for i in p1_indices:
-        team_players = deepcopy(p1.repr[i].players)
+        team_players = list(p1.repr[i].players)
         offspring_teams.append(Team(team_players))
-        used_names.update(p['Name'] for p in team_players)
+        for p in team_players:
+            free.take(table.name_to_id[p['Name']])
 
     # teams from p2
     for i in p2_indices:
-        team_players = []
-        for p in p2.repr[i].players:
-            if p['Name'] not in used_names:
-                team_players.append(deepcopy(p))
-                used_names.add(p['Name'])
+        team_players = [p for p in p2.repr[i].players if free.take(table.name_to_id[p['Name']])]
         #if team is incomplete due to removed duplicates, fill remaining slots
-        if len(team_players) < TEAM_SIZE:
-            positions_needed = Counter(TEAM_STRUCTURE)
+        if len(team_players) < fixed_para.TEAM_SIZE:
+            positions_needed = Counter(fixed_para.TEAM_STRUCTURE)
             for p in team_players:
                 positions_needed[p['Position']] -= 1
 
             # fill remaining positions with available players not yet used
             for pos, count in positions_needed.items():
-                available = [name_to_player[n] for n in all_names - used_names if name_to_player[n]['Position'] == pos]
-                random.shuffle(available)
-                team_players.extend(available[:count])
-                used_names.update(p['Name'] for p in available[:count])
+                if count > 0:
+                    team_players.extend(table.records[pid] for pid in free.draw(pos, count))
 
         offspring_teams.append(Team(team_players))
 
     
-    return FootballSolution(offspring_teams, players_df)
+    return FootballSolution(offspring_teams)
 
 
 
@@ -0,0 +1,80 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from library.compact import encode_population, get_player_table
+from library.fitness_cache import canonical_keys
+
+'''
+Genotypic diversity of a population, to tell premature convergence from a population that has found the optimum.
+Teams have no identity (relabelling the teams of a league gives the same league), so leagues are compared by
+team-mate relations: which pairs of players play in the same team. The population is summarized by how many
+leagues put each pair of players together (a sparse count over the pairs that occur, each league contributing
+N_TEAMS * C(TEAM_SIZE, 2) pairs), and every statistic is read from those counts: O(pop_size x players x TEAM_SIZE)
+instead of comparing every pair of leagues.
+ - distance: mean over pairs of distinct individuals of the fraction of team-mate pairs they don't share
+   (symmetric difference / 2 * pairs per league: 0 for clones, 1 when no two players are together in both)
+ - entropy: mean over players of the entropy of their team-mates across the population, normalized to [0, 1]
+   (0 when every league gives them the same team-mates, 1 when they meet every other player equally often)
+ - unique: fraction of distinct individuals (canonical forms, see fitness_cache.py)
+'''
+
+# diversity statistics of one population, see population_diversity
+DiversityStats = namedtuple("DiversityStats", ["distance", "entropy", "unique"])
+
+
+def teammate_counts(cube, n_players):
+    """
+    Team-mate pairs (i, j) with i < j that occur in a (pop_size, N_TEAMS, TEAM_SIZE) id array, and the number
+    of leagues in which each of them play in the same team.
+    """
+    team_size = cube.shape[2]
+    a, b = np.triu_indices(team_size, k=1)
+    ids = np.sort(cube, axis=2).astype(np.int64)
+    keys = (ids[..., a] * n_players + ids[..., b]).ravel() #one key per (i, j) pair of every team
+    pairs, counts = np.unique(keys, return_counts=True)
+    return pairs // n_players, pairs % n_players, counts
+
+
+def mean_pairwise_distance(counts, pop_size, pairs_per_league):
+    """
+    Mean distance between distinct individuals from the team-mate pair counts: a pair together in c of the
+    pop_size leagues is in the symmetric difference of c * (pop_size - c) pairs of leagues.
+    """
+    if pop_size < 2:
+        return 0.0
+    disagreements = (counts * (pop_size - counts)).sum()
+    return float(disagreements / (pop_size * (pop_size - 1) / 2) / (2 * pairs_per_league))
+
+
+def teammate_entropy(i, j, counts, n_players, team_size):
+    """
+    Normalized entropy of the team-mates of every player that is in at least one league (NaN for the others):
+    from log(TEAM_SIZE - 1) (always the same team-mates) to log(n_players - 1) (every other player equally often).
+    """
+    #per player: sum of c and of c log c over its pairs, each pair counting for both players
+    ends = np.concatenate([i, j])
+    weights = np.concatenate([counts, counts]).astype(float)
+    total = np.bincount(ends, weights=weights, minlength=n_players)
+    c_log_c = np.bincount(ends, weights=weights * np.log(weights), minlength=n_players)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = np.log(total) - c_log_c / total #-sum p log p with p = c / total
+    low, high = math.log(max(team_size - 1, 1)), math.log(max(n_players - 1, 1))
+    if high <= low:
+        return np.where(total > 0, 0.0, np.nan)
+    return np.where(total > 0, np.clip((entropy - low) / (high - low), 0, 1), np.nan)
+
+
+def population_diversity(population, table=None):
+    """
+    DiversityStats of a population (a list of individuals or their (pop_size, N_TEAMS, TEAM_SIZE) id array).
+    """
+    table = table if table is not None else get_player_table()
+    cube = population if isinstance(population, np.ndarray) else encode_population(population, table)
+    pop_size, n_teams, team_size = cube.shape
+    n_players = len(table)
+    i, j, counts = teammate_counts(cube, n_players)
+    distance = mean_pairwise_distance(counts, pop_size, n_teams * team_size * (team_size - 1) // 2)
+    entropy = teammate_entropy(i, j, counts, n_players, team_size)
+    return DiversityStats(distance, float(np.nanmean(entropy)), len(set(canonical_keys(cube))) / pop_size)
@@ -0,0 +1,221 @@
+import math
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from library.classes import FootballSolution
+from library.compact import get_player_table, evaluate_population, INDEX_DTYPE
+from library import fixed_para
+
+'''
+Exact baseline: depth-first branch-and-bound over player -> team assignments.
+Players are assigned position by position (GK first, then DEF, MID, FWD), strongest first, and each one
+is tried in the teams that still have a free slot for its position, lowest skill sum first (a greedy
+dive, so a good league is found immediately). Teams in an identical partial state are interchangeable,
+so only one of them is tried (this removes the N_TEAMS! relabellings of every league).
+A node is pruned when an upper bound of the fitness of any completion is not better than the best league:
+ - each team's final skill sum lies between its current sum plus the smallest / largest skills still
+   available for its free slots, and the variance of the team sums is at least the variance of the closest
+   point of those intervals to a common mean
+ - when every player must be used and skills are integers, the sums are integers with a fixed total,
+   so the variance is at least that of the most even integer split
+ - the budget penalty is at least that of the current salaries plus the cheapest available players
+   (per team, and for the league as a whole).
+Fitness is the same as FootballSolution.fitness(). The default dataset is solved to optimality in well under
+a second; with fractional skills the variance bound is much weaker, so pass a time or node limit: the best
+league found is then returned with optimal=False and an upper bound of the optimum (the root bound).
+The limits are only checked once the first (greedy) dive has reached a league, so there is always one to return.
+'''
+
+# solver output: best league and its fitness, whether it is proven optimal, an upper bound of the optimal
+# fitness (equal to fitness when optimal), nodes explored and time taken
+ExactResult = namedtuple("ExactResult", ["solution", "fitness", "optimal", "bound", "nodes", "seconds"])
+
+
+def _variance_lower_bound(lo, hi):
+    """
+    min over x_i in [lo_i, hi_i] of the (population) variance of x: the variance is min_c mean((x_i - c)^2),
+    so it is the min over c of the mean squared distance from c to the intervals (convex, piecewise quadratic).
+    """
+    n = len(lo)
+    points = sorted(lo + hi)
+    best = math.inf
+    for a, b in zip([-math.inf] + points, points + [math.inf]):
+        #on (a, b) the terms that are active (c outside the interval) don't change
+        mid = b if a == -math.inf else (a if b == math.inf else (a + b) / 2)
+        ends = [h for h in hi if h < mid] + [l for l in lo if l > mid]
+        if not ends:
+            return 0.0
+        c = min(max(sum(ends) / len(ends), a), b)
+        best = min(best, sum((c - e) ** 2 for e in ends) / n)
+    return best
+
+
+def _fitness_upper_bound(variance, penalty, team_size):
+    return max(0.001, 1 / (1 + math.sqrt(max(variance, 0.0)) / team_size) - penalty)
+
+
+class _Search:
+    def __init__(self, table, time_limit, max_nodes):
+        self.table = table
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.start = time.perf_counter()
+        self.nodes = 0
+        self.stopped = False
+        #problem size of this search
+        self.positions = list(fixed_para.POSITIONS)
+        self.structure = dict(fixed_para.TEAM_STRUCTURE)
+        self.n_teams = fixed_para.N_TEAMS
+        self.team_size = fixed_para.TEAM_SIZE
+        self.budget = fixed_para.MAX_BUDGET
+
+        #players in branching order: by position, strongest first
+        self.groups = []
+        for pos in self.positions:
+            ids = sorted(table.position_ids[pos].tolist(), key=lambda i: (-table.skill[i], i))
+            if len(ids) < self.n_teams * self.structure[pos]:
+                raise ValueError(f"Not enough players for position {pos}: {len(ids)} < {self.n_teams * self.structure[pos]}")
+            skills = [float(table.skill[i]) for i in ids]
+            #sorted salaries of every suffix of the group, for the cheapest completion
+            suffix_salaries = [np.concatenate([[0.0], np.cumsum(sorted(table.salary[ids[k:]]))]) for k in range(len(ids) + 1)]
+            self.groups.append((pos, ids, skills, np.concatenate([[0.0], np.cumsum(skills)]), suffix_salaries))
+        self.order = [(g, k) for g, group in enumerate(self.groups) for k in range(len(group[1]))]
+
+        self.exact_total = all(len(group[1]) == self.n_teams * self.structure[group[0]] for group in self.groups)
+        integral = bool(np.all(table.skill == np.round(table.skill)))
+        self.integer_variance = 0.0
+        if self.exact_total and integral:
+            total = int(round(sum(sum(group[2]) for group in self.groups)))
+            r = total % self.n_teams
+            self.integer_variance = r * (self.n_teams - r) / self.n_teams ** 2
+
+        self.sums = [0.0] * self.n_teams
+        self.salaries = [0.0] * self.n_teams
+        self.counts = [[0] * len(self.positions) for _ in range(self.n_teams)]
+        self.teams = [[] for _ in range(self.n_teams)]
+        self.best = None
+        self.best_fitness = -math.inf
+
+    def bound(self, step):
+        """
+        Upper bound of the fitness of every completion of the current partial league (next player: order[step]).
+        """
+        lo = list(self.sums)
+        hi = list(self.sums)
+        salaries = list(self.salaries)
+        league_salary = sum(self.salaries) #cheapest completion of the whole league
+        first = self.order[step] if step < len(self.order) else (len(self.groups), 0)
+        for g, (pos, ids, skills, prefix, suffix_salaries) in enumerate(self.groups):
+            if g < first[0]:
+                continue
+            k = first[1] if g == first[0] else 0 #remaining players of the group: ids[k:], skill descending
+            n = len(ids)
+            need = self.structure[pos]
+            league_salary += suffix_salaries[k][sum(need - self.counts[t][g] for t in range(self.n_teams))]
+            for t in range(self.n_teams):
+                r = need - self.counts[t][g]
+                if r:
+                    hi[t] += prefix[k + r] - prefix[k]
+                    lo[t] += prefix[n] - prefix[n - r]
+                    salaries[t] += suffix_salaries[k][r]
+        variance = max(_variance_lower_bound(lo, hi), self.integer_variance)
+        #the excess of the whole league is spread over the teams at best
+        penalty = max(sum(max(s - self.budget, 0) * 0.5 for s in salaries),
+                      max(league_salary - self.n_teams * self.budget, 0) * 0.5)
+        return _fitness_upper_bound(variance, penalty, self.team_size)
+
+    def leaf(self):
+        skills = [s / self.team_size for s in self.sums]
+        penalty = sum(max(s - self.budget, 0) * 0.5 for s in self.salaries)
+        fitness = max(0.001, 1 / (1 + np.std(skills)) - penalty)
+        if fitness > self.best_fitness:
+            self.best_fitness = fitness
+            self.best = [list(team) for team in self.teams]
+
+    def out_of_budget(self):
+        self.nodes += 1
+        if self.best is None:
+            return False #the limits only apply once the first dive has found a league
+        if self.time_limit is not None and time.perf_counter() - self.start > self.time_limit:
+            self.stopped = True
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            self.stopped = True
+        return self.stopped
+
+    def search(self, step=0):
+        if self.out_of_budget():
+            return
+        if step == len(self.order):
+            self.leaf()
+            return
+        #nothing can be pruned before the first league is found
+        if self.best is not None and self.bound(step) <= self.best_fitness + 1e-12: #tolerance: the bound and the leaves round differently
+            return
+
+        g, k = self.order[step]
+        pos, ids, skills, prefix, suffix_salaries = self.groups[g]
+        pid = ids[k]
+        need = self.structure[pos]
+        free_slots = sum(need - self.counts[t][g] for t in range(self.n_teams))
+
+        tried = set()
+        for t in sorted(range(self.n_teams), key=lambda t: (self.sums[t], t)):
+            if self.counts[t][g] >= need:
+                continue
+            state = (self.sums[t], self.salaries[t], tuple(self.counts[t]))
+            if state in tried:
+                continue #same partial team as one already tried: interchangeable
+            tried.add(state)
+
+            self.sums[t] += skills[k]
+            self.salaries[t] += float(self.table.salary[pid])
+            self.counts[t][g] += 1
+            self.teams[t].append(pid)
+            self.search(step + 1)
+            self.teams[t].pop()
+            self.counts[t][g] -= 1
+            self.salaries[t] -= float(self.table.salary[pid])
+            self.sums[t] -= skills[k]
+            if self.stopped:
+                return
+
+        #leave the player out, if the rest of the group can still fill every free slot
+        if len(ids) - k - 1 >= free_slots:
+            self.search(step + 1)
+
+
+def solve_exact(table=None, time_limit=None, max_nodes=None):
+    """
+    Best league of the dataset (default: the shared player table) by branch-and-bound.
+    Returns an ExactResult; optimal=False if the time / node limit stopped the search first
+    (the limits are honoured after the first complete league, which takes one node per player).
+    """
+    table = table if table is not None else get_player_table()
+    search = _Search(table, time_limit, max_nodes)
+    root_bound = search.bound(0)
+    #the search recurses once per player of the pool
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, len(search.order) + 1000))
+    try:
+        search.search()
+    finally:
+        sys.setrecursionlimit(limit)
+
+    #teams keep TEAM_STRUCTURE order (GK, DEF, DEF, MID...), as in the rest of the library
+    cube = np.array([[sorted(team, key=lambda i: table.position_code[i]) for team in search.best]], dtype=INDEX_DTYPE)
+    fitness = float(evaluate_population(cube, table)[0])
+    solution = FootballSolution([table.decode_team(ids) for ids in cube[0]])
+    solution.set_evaluation(fitness)
+    optimal = not search.stopped
+    return ExactResult(solution, fitness, optimal, fitness if optimal else max(root_bound, fitness),
+                       search.nodes, time.perf_counter() - search.start)
+
+
+def optimality_gap(fitness, result):
+    """
+    Relative distance of a fitness (e.g. a GA's best) to the optimum, or to its upper bound if not proven.
+    """
+    return (result.bound - fitness) / result.bound
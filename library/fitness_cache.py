@@ -0,0 +1,73 @@
+from collections import OrderedDict
+import numpy as np
+
+'''
+Order-independent identity of a league and a bounded fitness cache keyed by it.
+Two leagues that only differ by the order of the teams or of the players inside a team have the same
+fitness, so they get the same canonical form: player ids sorted inside each team, then teams sorted
+(teams never share a player, so sorting them by their smallest id is a total order).
+The bytes of that array are the key (exact, hashable, no collisions).
+'''
+
+
+def canonical_form(ids):
+    """
+    Canonical form of one league (N_TEAMS, TEAM_SIZE) or of a population (pop_size, N_TEAMS, TEAM_SIZE) of ids.
+    """
+    ids = np.sort(np.asarray(ids), axis=-1)
+    order = np.argsort(ids[..., 0], axis=-1)
+    return np.take_along_axis(ids, order[..., None], axis=-2)
+
+
+def canonical_key(ids):
+    return canonical_form(ids).tobytes()
+
+
+def canonical_keys(cube):
+    """
+    One key per league of a (pop_size, N_TEAMS, TEAM_SIZE) id array.
+    """
+    return [form.tobytes() for form in canonical_form(cube)]
+
+
+class FitnessCache:
+    """
+    LRU map canonical key -> fitness, bounded to maxsize entries. Meant to be shared by a whole run
+    (every individual of every generation), see compact.population_fitness.
+    """
+    def __init__(self, maxsize=10000):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        """
+        Cached fitness of the key (marked as recently used) or None.
+        """
+        fitness = self._data.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return fitness
+
+    def put(self, key, fitness):
+        self._data[key] = fitness
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False) #least recently used
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,28 +1,200 @@
-import pandas as pd
+import hashlib
+import json
 import os
+import tempfile
+import zipfile
+import numpy as np
+import pandas as pd
+
+'''
+Problem parameters and dataset loading.
+The players CSV is no longer read at import time: it is loaded on first use (get_players_df(),
+or the players_df attribute of this module) and cached. The file used is, in order:
+an explicit path given to set_players_path()/load_players(), the CIFO_PLAYERS_CSV environment
+variable, the data/ folder of the repository, then the old hardcoded paths.
+Parsed tables are also stored in a binary .npz sidecar keyed by the file hash, so that
+new processes (e.g. pool workers) skip the CSV parsing.
+The problem size (team structure, number of teams, budget) defaults to the 5 teams of 1-2-2-2 of the
+project and can be changed with set_problem() or the CIFO_PROBLEM environment variable (JSON); the rest
+of the library reads these values at call time (fixed_para.N_TEAMS...), never copies of them.
+'''
+
+PLAYERS_CSV_ENV = "CIFO_PLAYERS_CSV"
+CACHE_DIR_ENV = "CIFO_CACHE_DIR" #where to write the binary sidecars (default: next to the CSV)
+PROBLEM_ENV = "CIFO_PROBLEM" #JSON {"team_structure": {...}, "n_teams": ..., "max_budget": ...}
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "players(in).csv")
 
 paths = [
     r"C:\Users\inesm\OneDrive\Documentos\GitHub\CIFO2025\data\players(in).csv",
     r"C:\Users\rodri\Desktop\Nova IMS\1ano\2nd Semester\Computational Intelligence for Otimization\CIFO2025\data\players(in).csv",
-    r"C:\Users\pedro\Documentos\GitHub\CIFO2025\data\players(in).csv"
+    r"C:\Users\pedro\Documentos\GitHub\CIFO2025\data\players(in).csv",
     r"C:\Users\luis\Documentos\mestrado\GitHub\CIFO2025\data\players(in).csv"
 ]
 
-players_df = None
-for path in paths:
-    if os.path.exists(path):
-        try:
-            players_df = pd.read_csv(path)
-            print(f"dataset load from: {path}")
-            break
-        except Exception as e:
-            print(f"error while reading from: {path}\n{e}")
-
-if players_df is None:
-    raise FileNotFoundError("not able to find the file")
-
 POSITIONS = ["GK", "DEF", "MID", "FWD"]
 TEAM_STRUCTURE = {"GK": 1, "DEF": 2, "MID": 2, "FWD": 2}
 TEAM_SIZE = 7
 N_TEAMS = 5
-MAX_BUDGET = 750
\ No newline at end of file
+MAX_BUDGET = 750
+
+
+def problem():
+    """
+    Current problem size as a JSON-friendly dict (see set_problem).
+    """
+    return {"team_structure": dict(TEAM_STRUCTURE), "n_teams": N_TEAMS, "max_budget": MAX_BUDGET}
+
+
+def set_problem(team_structure=None, n_teams=None, max_budget=None):
+    """
+    Changes the problem size: players per position in a team, number of teams and budget per team
+    (None keeps the current value). The dataset may hold more players than the league needs.
+    Like set_players_path, it is exported through the environment so worker processes started
+    afterwards solve the same problem.
+    """
+    global POSITIONS, TEAM_STRUCTURE, TEAM_SIZE, N_TEAMS, MAX_BUDGET
+    if team_structure is not None:
+        if not team_structure or any(int(n) < 1 for n in team_structure.values()):
+            raise ValueError("The team structure needs at least one position with at least one player")
+        TEAM_STRUCTURE = {pos: int(n) for pos, n in team_structure.items()}
+        POSITIONS = list(TEAM_STRUCTURE)
+        TEAM_SIZE = sum(TEAM_STRUCTURE.values())
+    if n_teams is not None:
+        if n_teams < 2:
+            raise ValueError("A league needs at least 2 teams")
+        N_TEAMS = int(n_teams)
+    if max_budget is not None:
+        MAX_BUDGET = max_budget
+    os.environ[PROBLEM_ENV] = json.dumps(problem())
+
+
+if os.environ.get(PROBLEM_ENV):
+    set_problem(**json.loads(os.environ[PROBLEM_ENV]))
+
+_players_path = None
+_loaded = {} #resolved path -> DataFrame
+_players_df = None #dataset installed in memory (use_players_df), takes precedence over any file
+
+
+def find_players_csv(path=None):
+    """
+    Returns the dataset path to use (see the module docstring for the lookup order).
+    """
+    if path is None:
+        path = _players_path or os.environ.get(PLAYERS_CSV_ENV)
+    if path is not None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"players file not found: {path}")
+        return os.path.abspath(path)
+    for candidate in [DEFAULT_PATH] + paths:
+        if os.path.exists(candidate):
+            return os.path.abspath(candidate)
+    raise FileNotFoundError(f"not able to find the file (set {PLAYERS_CSV_ENV} or call set_players_path)")
+
+
+def _sidecar_path(csv_path, digest):
+    cache_dir = os.environ.get(CACHE_DIR_ENV) or os.path.dirname(csv_path)
+    return os.path.join(cache_dir, f".{os.path.basename(csv_path)}.{digest[:16]}.npz")
+
+
+def _read_sidecar(sidecar):
+    with np.load(sidecar, allow_pickle=False) as data:
+        columns = [str(c) for c in data["__columns__"]]
+        return pd.DataFrame({c: data[f"col{i}"] for i, c in enumerate(columns)})
+
+
+def _write_sidecar(sidecar, df):
+    arrays = {"__columns__": np.array(df.columns, dtype=str)}
+    for i, c in enumerate(df.columns):
+        values = df[c].to_numpy()
+        arrays[f"col{i}"] = values.astype(str) if values.dtype == object else values
+    try:
+        #one temp file per writer, renamed atomically: concurrent workers never read or clobber half a file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(sidecar), suffix=".npz")
+    except OSError:
+        return #read-only location, just skip the cache
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.chmod(tmp, 0o644) #mkstemp files are private
+        os.replace(tmp, sidecar)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load_players(path=None, binary_cache=True):
+    """
+    Loads (and caches) the players table. With binary_cache, the parsed table is read from / written to
+    an .npz sidecar keyed by the CSV hash, so the CSV is only parsed once per file version.
+    """
+    csv_path = find_players_csv(path)
+    if csv_path in _loaded:
+        return _loaded[csv_path]
+
+    df = None
+    if binary_cache:
+        with open(csv_path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        sidecar = _sidecar_path(csv_path, digest)
+        if os.path.exists(sidecar):
+            try:
+                df = _read_sidecar(sidecar)
+            except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+                df = None #corrupt or stale sidecar: parse the CSV and rewrite it
+        if df is None:
+            df = pd.read_csv(csv_path)
+            _write_sidecar(sidecar, df)
+    else:
+        df = pd.read_csv(csv_path)
+
+    _loaded[csv_path] = df
+    return df
+
+
+def set_players_path(path):
+    """
+    Selects the dataset used by get_players_df(). It is also exported through the environment
+    variable so that worker processes started afterwards use the same file.
+    """
+    global _players_path
+    _players_path = os.path.abspath(path)
+    os.environ[PLAYERS_CSV_ENV] = _players_path
+
+
+def use_players_df(df):
+    """
+    Installs an in-memory players table as the dataset of this process (None goes back to the file).
+    df can also be a function returning the table, called the first time get_players_df() needs it.
+    Used by worker processes attached to a shared player table (see shared_table.py).
+    """
+    global _players_df
+    _players_df = df
+
+
+def get_players_df():
+    """
+    Returns the players table, loading it on first use.
+    """
+    global _players_df
+    if callable(_players_df):
+        _players_df = _players_df()
+    if _players_df is not None:
+        return _players_df
+    return load_players()
+
+
+def players_source():
+    """
+    Identity of the current dataset without building it: the installed table or the function that will build
+    it (see use_players_df), else the table loaded from file.
+    """
+    return _players_df if _players_df is not None else load_players()
+
+
+def __getattr__(name):
+    #keeps `fixed_para.players_df` working, but only loads the data when it is actually used
+    if name == "players_df":
+        return get_players_df()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from itertools import product
+from types import BuiltinFunctionType, FunctionType, MethodType
+
+import numpy as np
+
+from library.GA import run_ga, _resolve_n_jobs
+from library.results_store import GridResults
+from library.streaming import JsonlRecorder
+from library.shared_table import SharedPlayerTable, attach_player_table
+from library import fixed_para
+
+'''
+Reusable, resumable grid search over GA operator combinations.
+Every (combination, run) pair is an independent task: tasks are scheduled over a process pool
+and each finished one is appended to a JSON-lines checkpoint file, so rerunning the same grid
+after a crash only runs what is missing. Every record carries a fingerprint of its task (function,
+arguments, grid seed, problem size): a record written by another configuration is never reused.
+'''
+
+
+def grid_combinations(operator_grid):
+    """
+    Expands {axis: {choice_name: value}} into the list of combinations, each one a dict {axis: choice_name}
+    (cartesian product, in the order of the dicts).
+    """
+    axes = list(operator_grid)
+    return [dict(zip(axes, names)) for names in product(*(operator_grid[axis] for axis in axes))]
+
+
+def combination_label(combination, sep="|"):
+    return sep.join(str(name) for name in combination.values())
+
+
+def combination_params(operator_grid, combination, fixed_params=None):
+    """
+    Builds the keyword arguments of one task. A choice whose value is a dict is merged as is
+    (e.g. {"crossover_func": f, "two_children": True}), any other value is stored under its axis name.
+    """
+    params = dict(fixed_params or {})
+    for axis, name in combination.items():
+        value = operator_grid[axis][name]
+        if isinstance(value, dict):
+            params.update(value)
+        else:
+            params[axis] = value
+    return params
+
+
+def task_seed(seed, label, run):
+    """
+    Deterministic seed of one (combination, run) task, independent of scheduling order.
+    None gives a fresh random seed.
+    """
+    if seed is None:
+        return int(np.random.SeedSequence().generate_state(1)[0])
+    return int(np.random.SeedSequence(seed, spawn_key=(zlib.crc32(label.encode()), run)).generate_state(1)[0])
+
+
+def _describe(value):
+    """
+    Stable, JSON-able description of a task argument, the same in every process: plain values as they are,
+    containers element by element, functions and classes by qualified name, partials by their parts and
+    other objects by class and public attributes (the _private ones are runtime state, e.g. a termination
+    policy's counters). Anything else would need a repr, which may hold an address: TypeError.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return {"ndarray": str(value.dtype), "values": value.tolist()}
+    if isinstance(value, (list, tuple)):
+        return [_describe(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _describe(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, partial):
+        return {"partial": _describe(value.func), "args": _describe(value.args),
+                "keywords": _describe(value.keywords)}
+    if isinstance(value, (type, FunctionType, BuiltinFunctionType)):
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, MethodType):
+        return {"method": _describe(value.__func__), "self": _describe(value.__self__)}
+    if hasattr(value, "__dict__"):
+        return {"class": _describe(type(value)),
+                "attributes": _describe({k: v for k, v in vars(value).items() if not k.startswith("_")})}
+    raise TypeError(f"cannot fingerprint task argument {value!r}")
+
+
+def task_fingerprint(task, params, seed):
+    """
+    Short hash of everything that determines the result of a task besides its run number:
+    the task function, its arguments, the grid seed and the problem size (fixed_para.problem()).
+    """
+    text = json.dumps({"task": _describe(task), "params": {k: _describe(v) for k, v in params.items()},
+                       "seed": seed, "problem": fixed_para.problem()}, sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def load_checkpoint(path):
+    """
+    Returns {(label, run): record} for every task already stored in the checkpoint file
+    (the last record of a task wins). A truncated last line (crash while writing) is ignored.
+    """
+    done = {}
+    if path is None or not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[(record["combination"], record["run"])] = record
+    return done
+
+
+def _append_checkpoint(f, record):
+    f.write(json.dumps(record) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def run_grid_search(operator_grid, n_runs=30, fixed_params=None, combinations=None, task=run_ga,
+                    checkpoint_path=None, n_jobs=1, seed=None, sep="|", verbose=True, store_path=None,
+                    stream_path=None):
+    """
+    Runs every combination of `operator_grid` n_runs times.
+
+    operator_grid: {axis: {choice_name: value}}, see combination_params for how values become task arguments
+    fixed_params: arguments shared by every task (generations, pop_size, ...)
+    combinations: optional explicit list of {axis: choice_name} (defaults to the full cartesian product)
+    task: picklable function called as task(**params, seed=...), run_ga by default
+    checkpoint_path: JSON-lines file where each finished task is stored; existing tasks are skipped when their
+    fingerprint (see task_fingerprint) matches, and run again otherwise
+    n_jobs: number of worker processes (-1 for all cores)
+    store_path: if given, the (combination, run, generation) fitness cube, seeds and parameters are also
+    saved there as a binary result set (see results_store.py)
+    stream_path: if given, every generation of every task is appended to this JSON-lines file as soon as it
+    is done (task must accept `callbacks`, as run_ga does), to monitor the grid live
+
+    Returns {label: [result of run 0, ..., result of run n_runs-1]} in combination order.
+    """
+    if combinations is None:
+        combinations = grid_combinations(operator_grid)
+    labels = [combination_label(c, sep) for c in combinations]
+    done = load_checkpoint(checkpoint_path)
+
+    pending = []
+    stale = 0
+    for combination, label in zip(combinations, labels):
+        params = combination_params(operator_grid, combination, fixed_params)
+        fingerprint = task_fingerprint(task, params, seed)
+        for run in range(n_runs):
+            record = done.get((label, run))
+            if record is None or record.get("fingerprint") != fingerprint:
+                stale += record is not None
+                task_params = params
+                if stream_path is not None:
+                    task_params = dict(params, callbacks=[JsonlRecorder(stream_path, {"combination": label, "run": run})])
+                pending.append((label, run, task_params, task_seed(seed, label, run), fingerprint))
+
+    if verbose:
+        print(f"{len(labels) * n_runs - len(pending)} tasks already done, {len(pending)} to run"
+              + (f" ({stale} checkpointed with other parameters)" if stale else ""))
+
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+    try:
+        def store(label, run, run_seed, fingerprint, result):
+            record = {"combination": label, "run": run, "seed": run_seed, "fingerprint": fingerprint,
+                      "result": [float(v) for v in result]}
+            done[(label, run)] = record
+            if checkpoint is not None:
+                _append_checkpoint(checkpoint, record)
+
+        n_jobs = _resolve_n_jobs(n_jobs)
+        if n_jobs == 1:
+            for label, run, params, run_seed, fingerprint in pending:
+                store(label, run, run_seed, fingerprint, task(**params, seed=run_seed))
+                if verbose:
+                    print(f"done {label} run {run}")
+        elif pending:
+            with SharedPlayerTable() as shared, ProcessPoolExecutor(max_workers=min(n_jobs, len(pending)),
+                                                                    initializer=attach_player_table,
+                                                                    initargs=(shared.handle,)) as pool:
+                futures = {pool.submit(task, **params, seed=run_seed): (label, run, run_seed, fingerprint)
+                           for label, run, params, run_seed, fingerprint in pending}
+                for future in as_completed(futures):
+                    label, run, run_seed, fingerprint = futures[future]
+                    store(label, run, run_seed, fingerprint, future.result())
+                    if verbose:
+                        print(f"done {label} run {run}")
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+    results = {label: [done[(label, run)]["result"] for run in range(n_runs)] for label in labels}
+    if store_path is not None:
+        seeds = {label: [done[(label, run)]["seed"] for run in range(n_runs)] for label in labels}
+        params = dict(fixed_params or {}, n_runs=n_runs, seed=seed)
+        GridResults.from_runs(results, seeds, combinations, params).save(store_path)
+    return results
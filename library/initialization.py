@@ -0,0 +1,74 @@
+import numpy as np
+from library.classes import FootballSolution
+from library.compact import get_player_table, numpy_rng, INDEX_DTYPE
+from library import fixed_para
+
+'''
+Vectorized random initialization. Each position pool of the player table is permuted independently
+for every individual (random sort keys + argsort) and the first N_TEAMS * count players are dealt
+to the teams, so every league is valid by construction: no retries and no name filtering.
+'''
+
+
+def _lhs_keys(rng, pop_size, n_players):
+    """
+    Latin-hypercube sort keys: for each player, its key falls in a different 1/pop_size stratum
+    in every individual, so each player is spread evenly over the teams across the population.
+    """
+    strata = np.argsort(rng.random((n_players, pop_size)), axis=1).T
+    return (strata + rng.random((pop_size, n_players))) / pop_size
+
+
+def _smallest_keys(keys, k):
+    """
+    Column indices of the k smallest keys of each row, in increasing key order (same as argsort()[:, :k]),
+    without sorting the whole row when the pool is larger than the demand.
+    """
+    if k < keys.shape[1]:
+        part = np.argpartition(keys, k - 1, axis=1)[:, :k]
+        return np.take_along_axis(part, np.argsort(np.take_along_axis(keys, part, axis=1), axis=1), axis=1)
+    return np.argsort(keys, axis=1)
+
+
+def random_population_ids(pop_size, seed=None, method="random", table=None, rng=None):
+    """
+    Returns a (pop_size, N_TEAMS, TEAM_SIZE) array of player ids, one valid league per individual.
+    Players are laid out per team in TEAM_STRUCTURE order (GK, DEF, DEF, MID, ...).
+
+    method: "random" (independent uniform permutations) or "lhs" (latin-hypercube style diversity)
+    """
+    if method not in ("random", "lhs"):
+        raise ValueError(f"unknown initialization method: {method}")
+    table = table if table is not None else get_player_table()
+    rng = rng if rng is not None else numpy_rng(seed)
+
+    cube = np.empty((pop_size, fixed_para.N_TEAMS, fixed_para.TEAM_SIZE), dtype=INDEX_DTYPE)
+    col = 0
+    for pos, count in fixed_para.TEAM_STRUCTURE.items():
+        pool = table.position_ids[pos]
+        needed = fixed_para.N_TEAMS * count
+        if len(pool) < needed:
+            raise ValueError(f"Not enough players for position {pos}: {len(pool)} < {needed}")
+        if method == "lhs":
+            keys = _lhs_keys(rng, pop_size, len(pool))
+        else:
+            keys = rng.random((pop_size, len(pool)))
+        chosen = _smallest_keys(keys, needed)
+        cube[:, :, col:col + count] = pool[chosen].reshape(pop_size, fixed_para.N_TEAMS, count)
+        col += count
+    return cube
+
+
+def solutions_from_ids(cube, table=None):
+    """
+    Decodes a (pop_size, N_TEAMS, TEAM_SIZE) id array into dict-based FootballSolution objects.
+    """
+    table = table if table is not None else get_player_table()
+    return [FootballSolution([table.decode_team(ids) for ids in league]) for league in cube]
+
+
+def random_population(pop_size, seed=None, method="random", table=None, rng=None):
+    """
+    pop_size random valid FootballSolution individuals generated in one vectorized call.
+    """
+    return solutions_from_ids(random_population_ids(pop_size, seed, method, table, rng), table)
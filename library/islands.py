@@ -0,0 +1,135 @@
+import multiprocessing as mp
+import traceback
+from collections import namedtuple
+
+import numpy as np
+
+from library.compact import CompactSolution, encode_population
+from library.GA import run_seeds
+from library.shared_table import SharedPlayerTable, attach_player_table
+
+'''
+Island model: K sub-populations of the same GeneticAlgorithm evolve in separate processes and every
+`migration_interval` generations each island sends copies of its best `n_migrants` individuals to its
+neighbours in the migration topology, where they replace the worst individuals.
+Migrants travel as compact id arrays (see compact.py) with their fitness, never as pickled Team dicts.
+Migration is synchronous (an island waits for the migrants of all its sources), so a seeded run is reproducible.
+'''
+
+# result of an island run: best fitness over all islands per generation, best individual and its fitness,
+# and the history of every island
+IslandResult = namedtuple("IslandResult", ["history", "best", "best_fitness", "island_histories"])
+
+
+def migration_targets(topology, n_islands):
+    """
+    Destinations of each island's migrants: "ring" (i -> i+1), "bidirectional_ring" (i -> i-1 and i+1),
+    "complete" (i -> every other island), or an explicit {island: [targets]} / list of target lists.
+    """
+    if topology == "ring":
+        targets = [[(i + 1) % n_islands] for i in range(n_islands)]
+    elif topology == "bidirectional_ring":
+        targets = [sorted({(i - 1) % n_islands, (i + 1) % n_islands}) for i in range(n_islands)]
+    elif topology == "complete":
+        targets = [[j for j in range(n_islands) if j != i] for i in range(n_islands)]
+    elif isinstance(topology, dict):
+        targets = [list(topology.get(i, [])) for i in range(n_islands)]
+    elif isinstance(topology, (list, tuple)) and len(topology) == n_islands:
+        targets = [list(t) for t in topology]
+    else:
+        raise ValueError(f"Unknown migration topology: {topology!r}")
+    if n_islands == 1:
+        return [[]]
+    for i, dests in enumerate(targets):
+        if any(j == i or not 0 <= j < n_islands for j in dests):
+            raise ValueError(f"Invalid migration targets for island {i}: {dests}")
+    return targets
+
+
+def _migrate(population, fitness, inbox, outboxes, n_sources, n_migrants):
+    #send the best individuals as ids, then replace the worst ones with everything received
+    best = np.argsort(fitness)[::-1][:n_migrants]
+    packet = (encode_population([population[i] for i in best]), np.asarray(fitness[best], dtype=np.float64))
+    for queue in outboxes:
+        queue.put(packet)
+    incoming = [inbox.get() for _ in range(n_sources)]
+    if not incoming:
+        return
+    ids = np.concatenate([p[0] for p in incoming])
+    fits = np.concatenate([p[1] for p in incoming])
+    worst = np.argsort(fitness)[:len(fits)]
+    for slot, league, fit in zip(worst, ids, fits):
+        migrant = CompactSolution(league).to_solution()
+        migrant.set_evaluation(fit)
+        population[slot] = migrant
+        fitness[slot] = fit
+
+
+def _island_worker(ga, island, seed, inbox, outboxes, n_sources, interval, n_migrants, results, shared_handle):
+    try:
+        attach_player_table(shared_handle)
+        history = []
+        best, best_fitness = None, -np.inf
+        #the engine keeps using the population/fitness objects it yielded, so migrants are swapped in place
+        for record, population, fitness in ga._evolve(seed, island):
+            best_idx = int(np.argmax(fitness))
+            if fitness[best_idx] > best_fitness:
+                best, best_fitness = population[best_idx], float(fitness[best_idx])
+            if record is None:
+                continue
+            history.append(float(fitness[best_idx]))
+            generation = record.generation + 1
+            if interval and generation % interval == 0 and generation < ga.generations:
+                _migrate(population, fitness, inbox, outboxes, n_sources, n_migrants)
+        results.put((island, history, encode_population([best])[0], best_fitness, None))
+    except Exception:
+        results.put((island, None, None, None, traceback.format_exc()))
+
+
+class IslandModel:
+    """
+    Runs a configured GeneticAlgorithm as n_islands sub-populations (one process each, pop_size individuals
+    per island) with periodic migration.
+    """
+    def __init__(self, ga, n_islands=4, migration_interval=10, n_migrants=2, topology="ring"):
+        if ga.termination:
+            raise ValueError("Termination policies are not supported in island mode (migration is synchronous)")
+        self.ga = ga
+        self.n_islands = n_islands
+        self.migration_interval = migration_interval
+        self.n_migrants = n_migrants
+        self.topology = topology
+        self.targets = migration_targets(topology, n_islands)
+
+    def run(self, seed=None):
+        ctx = mp.get_context()
+        shared = SharedPlayerTable()
+        inboxes = [ctx.Queue() for _ in range(self.n_islands)]
+        results = ctx.Queue()
+        n_sources = [sum(i in dests for dests in self.targets) for i in range(self.n_islands)]
+        processes = [ctx.Process(target=_island_worker,
+                                 args=(self.ga, i, island_seed, inboxes[i], [inboxes[j] for j in self.targets[i]],
+                                       n_sources[i], self.migration_interval, self.n_migrants, results, shared.handle),
+                                 daemon=True)
+                     for i, island_seed in enumerate(run_seeds(seed, self.n_islands))]
+        for process in processes:
+            process.start()
+
+        outputs = {}
+        try:
+            for _ in processes:
+                island, history, best_ids, best_fitness, error = results.get()
+                if error is not None:
+                    raise RuntimeError(f"Island {island} failed:\n{error}")
+                outputs[island] = (history, best_ids, best_fitness)
+        finally:
+            for process in processes:
+                if process.is_alive() and len(outputs) < self.n_islands:
+                    process.terminate()
+                process.join()
+            shared.close()
+
+        island_histories = [outputs[i][0] for i in range(self.n_islands)]
+        best_island = max(range(self.n_islands), key=lambda i: outputs[i][2])
+        best = CompactSolution(outputs[best_island][1]).to_solution()
+        return IslandResult(np.max(island_histories, axis=0).tolist(), best, outputs[best_island][2], island_histories)
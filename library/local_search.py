@@ -0,0 +1,136 @@
+from collections import namedtuple
+
+import numpy as np
+
+from library import fixed_para
+from library.compact import table_for, numpy_rng
+
+'''
+Hill climbing over the same-position swap neighbourhood: every exchange of two players with the same
+position between two different teams (130 moves for 5 teams of 1-2-2-2). Same-position swaps keep every
+team valid, and a swap only changes two team sums, so the fitness of a move is an O(1) update of the
+variance of the team sums (kept as deviations from their mean, which swaps don't change) and of the
+penalties of the two teams; the whole neighbourhood is scored in one vectorized pass.
+For large leagues the full neighbourhood grows with the square of the number of teams, so `neighbours`
+can limit every step to that many random moves.
+Moves are applied through FootballSolution.swap_players, so the solution's fitness cache stays consistent.
+'''
+
+# outcome of a hill climb: the refined solution, the number of moves applied and of neighbours evaluated
+LocalSearchResult = namedtuple("LocalSearchResult", ["solution", "moves", "evaluations"])
+
+STRATEGIES = ("best", "first")
+
+
+def swap_neighbourhood(position_codes):
+    """
+    (a, b) arrays of flat slot indices (team * TEAM_SIZE + slot) of every same-position swap between two teams.
+    """
+    pos = np.asarray(position_codes).ravel()
+    team = np.arange(pos.size) // fixed_para.TEAM_SIZE
+    a, b = [], []
+    for code in np.unique(pos):
+        slots = np.flatnonzero(pos == code)
+        i, j = np.triu_indices(len(slots), k=1)
+        different = team[slots[i]] != team[slots[j]]
+        a.append(slots[i[different]])
+        b.append(slots[j[different]])
+    return np.concatenate(a), np.concatenate(b)
+
+
+def random_swaps(position_codes, n, rng):
+    """
+    n random same-position swaps between two teams (fewer once same-team draws are dropped).
+    """
+    pos = np.asarray(position_codes).ravel()
+    team = np.arange(pos.size) // fixed_para.TEAM_SIZE
+    a = rng.integers(pos.size, size=n)
+    b = np.empty_like(a)
+    for code in np.unique(pos[a]):
+        slots = np.flatnonzero(pos == code)
+        mask = pos[a] == code
+        b[mask] = slots[rng.integers(len(slots), size=mask.sum())]
+    different = team[a] != team[b]
+    return a[different], b[different]
+
+
+def _penalty(salaries):
+    return np.maximum(salaries - fixed_para.MAX_BUDGET, 0) * 0.5
+
+
+def neighbourhood_fitness(skill_sums, salaries, skill, salary, a, b):
+    """
+    Fitness of every swap (a[m], b[m]) given the team sums and the per-slot skill / salary of the league,
+    in O(1) per move. Same formula as FootballSolution.fitness() (up to rounding).
+    """
+    team_size = fixed_para.TEAM_SIZE
+    ta, tb = a // team_size, b // team_size
+    deviations = skill_sums - skill_sums.mean()
+    d_skill = skill[b] - skill[a]
+    d_salary = salary[b] - salary[a]
+
+    #squared deviations of the two teams change, the mean does not
+    variance = ((deviations ** 2).mean()
+                + (2 * d_skill * (deviations[ta] - deviations[tb]) + 2 * d_skill ** 2) / len(skill_sums))
+    team_penalty = _penalty(salaries)
+    penalty = (team_penalty.sum() - team_penalty[ta] - team_penalty[tb]
+               + _penalty(salaries[ta] + d_salary) + _penalty(salaries[tb] - d_salary))
+    return np.maximum(0.001, 1 / (1 + np.sqrt(np.maximum(variance, 0)) / team_size) - penalty)
+
+
+def hill_climb(solution, strategy="best", max_moves=None, in_place=False, rng=None, neighbours=None):
+    """
+    Applies improving same-position swaps until none is left (a local optimum) or max_moves were applied.
+    strategy "best" takes the best neighbour at every step, "first" the first improving one in a random order.
+    neighbours: evaluate only that many random moves per step instead of the full neighbourhood.
+    Works on a copy unless in_place. Returns a LocalSearchResult.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown local search strategy: {strategy}")
+    if not in_place:
+        solution = solution.copy()
+    team_size = fixed_para.TEAM_SIZE
+    table = table_for(solution.players_df)
+    ids = np.array([[table.name_to_id[p['Name']] for p in team.players] for team in solution.repr]).ravel()
+    positions = table.position_code[ids]
+    if (strategy == "first" or neighbours is not None) and rng is None:
+        rng = numpy_rng()
+    if neighbours is None:
+        a, b = swap_neighbourhood(positions)
+
+    skill = table.skill[ids]
+    salary = table.salary[ids]
+    skill_sums = skill.reshape(-1, team_size).sum(axis=1)
+    salaries = salary.reshape(-1, team_size).sum(axis=1)
+    current = solution.fitness()
+    moves = evaluations = 0
+    while max_moves is None or moves < max_moves:
+        if neighbours is not None:
+            a, b = random_swaps(positions, neighbours, rng)
+        if not len(a):
+            break
+        fitness = neighbourhood_fitness(skill_sums, salaries, skill, salary, a, b)
+        evaluations += len(a)
+        improving = np.flatnonzero(fitness > current + 1e-12)
+        if not len(improving):
+            break
+        m = improving[np.argmax(fitness[improving])] if strategy == "best" else rng.choice(improving)
+
+        i, j = a[m], b[m]
+        ti, tj = i // team_size, j // team_size
+        solution.swap_players(ti, i % team_size, tj, j % team_size)
+        new_fitness = solution.fitness()
+        if new_fitness <= current:
+            #the O(1) estimate was only off by rounding: undo and stop
+            solution.swap_players(ti, i % team_size, tj, j % team_size)
+            break
+        d_skill, d_salary = skill[j] - skill[i], salary[j] - salary[i]
+        skill_sums[ti] += d_skill
+        skill_sums[tj] -= d_skill
+        salaries[ti] += d_salary
+        salaries[tj] -= d_salary
+        skill[[i, j]] = skill[[j, i]]
+        salary[[i, j]] = salary[[j, i]]
+        current = new_fitness
+        moves += 1
+    return LocalSearchResult(solution, moves, evaluations)
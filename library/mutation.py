@@ -1,26 +1,74 @@
 import random
+from library import fixed_para
 '''
-This mutation operator swaps two players with the same position between two randomly 
-selected teams in the solution. The swap only happens if both teams remain valid after the 
-exchange and the resulting solution is unique. 
-If not, the original solution is returned unchanged. 
+Every mutation is split in two steps:
+- propose_*(solution) picks a move without touching the solution: a list of same-position swaps
+  (team_a, slot_i, team_b, slot_j). Feasibility is checked here, so an invalid move is never applied.
+  None means no feasible move (the mutation fails).
+- apply_moves / undo_moves apply the swaps in place (through FootballSolution.swap_players, which
+  updates the cached team sums) or roll them back from the undo log. They never evaluate the solution,
+  so the GA can evaluate all the children in one batch; move_delta is the opt-in version that also
+  returns the fitness delta.
+The mutate_*(self, solution) operators keep their original behaviour (return a new solution, or the
+original one when the mutation fails) but only copy the solution when a move is actually applied.
 '''
-def mutate_swap_between_teams(self, solution):
-    from copy import deepcopy
-    
-    new_repr = deepcopy(solution.repr)
+
+
+def apply_moves(solution, moves):
+    """
+    Applies the swaps in place. The move list itself is the undo log (see undo_moves).
+    """
+    for t1, i1, t2, i2 in moves:
+        solution.swap_players(t1, i1, t2, i2)
+
+
+def move_delta(solution, moves):
+    """
+    Applies the swaps in place and returns the fitness delta (new fitness - old fitness).
+    Evaluates the solution before and after: cheap when its team sums are cached, a full evaluation otherwise.
+    """
+    before = solution.fitness()
+    apply_moves(solution, moves)
+    return solution.fitness() - before
+
+
+def undo_moves(solution, moves):
+    """
+    Rolls back moves applied by apply_moves (a swap is its own inverse, so they are replayed in reverse order).
+    """
+    for t1, i1, t2, i2 in reversed(moves):
+        solution.swap_players(t1, i1, t2, i2)
+
+
+def _mutate_with(propose, solution):
+    #copy only when there is a move to apply, rejected mutations cost nothing
+    moves = propose(solution)
+    if not moves:
+        return solution
+    new_solution = solution.copy()
+    apply_moves(new_solution, moves)
+    return new_solution
+
+
+'''
+This mutation operator swaps two players with the same position between two randomly
+selected teams in the solution. The swap only happens if both teams remain valid after the
+exchange and the resulting solution is unique.
+If not, the original solution is returned unchanged.
+'''
+def propose_swap_between_teams(solution):
     # randomly select two distinct teams from the solution
-    team_indices = random.sample(range(len(new_repr)), 2)
-    t1, t2 = new_repr[team_indices[0]], new_repr[team_indices[1]]
+    team_indices = random.sample(range(len(solution.repr)), 2)
+    t1, t2 = solution.repr[team_indices[0]], solution.repr[team_indices[1]]
 
     # identify the set of positions in each team
     positions1 = {p['Position'] for p in t1.players}
     positions2 = {p['Position'] for p in t2.players}
-    common_positions = list(positions1 & positions2)
+    common_positions = sorted(positions1 & positions2) #sorted: set order changes between processes, seeded runs must not
     if not common_positions:
-        # if no common positions exist, return the original solution (mutation fails)
+        # if no common positions exist, the mutation fails
         #this is not suppose to happen, but it´s another layer of protection
-        return solution
+        return None
 
     # randomly select one of the shared positions
     pos = random.choice(common_positions)
@@ -28,113 +76,100 @@ def mutate_swap_between_teams(self, solution):
     p1_candidates = [i for i, p in enumerate(t1.players) if p['Position'] == pos]
     p2_candidates = [i for i, p in enumerate(t2.players) if p['Position'] == pos]
 
-    # if no candidates are found in either team, return the original solution
+    # if no candidates are found in either team, the mutation fails
     #again, another protection
     if not p1_candidates or not p2_candidates:
-        return solution
+        return None
 
     # randomly choose one player from each team with the selected position
+    # (a same-position swap between two teams keeps both teams valid and every player unique)
     i1 = random.choice(p1_candidates)
     i2 = random.choice(p2_candidates)
+    return [(team_indices[0], i1, team_indices[1], i2)]
 
-    # swap the players between the two teams
-    t1.players[i1], t2.players[i2] = t2.players[i2], t1.players[i1]
-
-    # validate the teams after the swap
-    if t1.is_valid() and t2.is_valid():
-        # recreate the solution with the modified representation
-        final_solution = solution.__class__(repr=new_repr)
-        # ensure the new solution is unique in the population
-        if is_unique(final_solution):
-            return final_solution
-    
-    # if mutation is invalid or not unique, return the original solution
-    return solution
+def mutate_swap_between_teams(self, solution):
+    return _mutate_with(propose_swap_between_teams, solution)
 
 '''
-This mutation operator randomly selects a player position and performs a global permutation of 
-all players with that position across teams except the GK. 
-It ensures that exactly two players of that position are reassigned per team. The mutation is only applied if all teams 
+This mutation operator randomly selects a player position and performs a global permutation of
+all players with that position across teams, for the positions with at least two players per team (all but the GK
+in the default structure). It ensures that every team keeps its count of players of that position. The mutation is only applied if all teams
 remain valid and the new solution is unique. Otherwise, the original solution is returned.
 '''
-#POR GK   
-def mutate_global_position_permutation(self, solution):
-    from copy import deepcopy
-    
-    new_repr = deepcopy(solution.repr)
-
+#POR GK
+def propose_global_position_permutation(solution):
     # choose a random position present in the solution
-    all_positions = {p['Position'] for team in new_repr for p in team.players}
+    all_positions = {p['Position'] for team in solution.repr for p in team.players}
     if not all_positions:
-        return solution
-    position = random.choice(list(all_positions))
-
-    # cet all players with the selected position
-    all_players = [p for team in new_repr for p in team.players if p['Position'] == position]
-    
-    # check if we have exactly 2 per team to ensure it's valid
-    if len(all_players) != 2 * len(new_repr):
-        return solution
+        return None
+    position = random.choice(sorted(all_positions))
+    if fixed_para.TEAM_STRUCTURE.get(position, 0) < 2: #a single player per team (the GK) is never permuted
+        return None
+
+    # get all the slots (team, index) holding the selected position
+    slots = [(t, i) for t, team in enumerate(solution.repr) for i, p in enumerate(team.players) if p['Position'] == position]
+
+    # check if we have exactly the structure's count per team to ensure it's valid
+    if len(slots) != fixed_para.TEAM_STRUCTURE[position] * len(solution.repr):
+        return None
+
+    # shuffle the players of that position over the slots, written as a sequence of swaps
+    current = list(range(len(slots)))
+    target = current[:]
+    random.shuffle(target)
+    where = {player: k for k, player in enumerate(current)}
+    moves = []
+    for k, player in enumerate(target):
+        j = where[player]
+        if j != k:
+            (t1, i1), (t2, i2) = slots[k], slots[j]
+            moves.append((t1, i1, t2, i2))
+            current[k], current[j] = current[j], current[k]
+            where[current[j]] = j
+            where[current[k]] = k
+    return moves
 
-    # shuffle and reassign two players per team
-    random.shuffle(all_players)
-    idx = 0
-    for team in new_repr:
-        count = 0
-        for i, p in enumerate(team.players):
-            if p['Position'] == position and count < 2:
-                team.players[i] = all_players[idx]
-                idx += 1
-                count += 1
-
-    # return new solution if valid and unique
-    if all(team.is_valid() for team in new_repr):
-        final_solution = solution.__class__(repr=new_repr)
-        if is_unique(final_solution):
-            return final_solution
-    return solution
+def mutate_global_position_permutation(self, solution):
+    return _mutate_with(propose_global_position_permutation, solution)
 
 
 
 '''
-This mutation operator randomly selects two different teams and swaps one player between them, 
-ensuring both players play the same position. The swap is only applied if both resulting teams 
+This mutation operator randomly selects two different teams and swaps one player between them,
+ensuring both players play the same position. The swap is only applied if both resulting teams
 remain valid and the new solution is unique. If not, the original solution is returned unchanged.
 '''
-def mutate_random_position_swap(self, solution):
-    from copy import deepcopy
-    new_repr = deepcopy(solution.repr)
+def propose_random_position_swap(solution):
     # randomly select two different teams
-    t1, t2 = random.sample(range(len(new_repr)), 2)
+    t1, t2 = random.sample(range(len(solution.repr)), 2)
 
     # get the list of players from each team
-    players1 = new_repr[t1].players
-    players2 = new_repr[t2].players
+    players1 = solution.repr[t1].players
+    players2 = solution.repr[t2].players
 
     # generate all possible pairs of player indices (i, j)
     # where the players from both teams play in the same position
     possible_pairs = [(i, j) for i in range(len(players1)) for j in range(len(players2))
                     if players1[i]['Position'] == players2[j]['Position']]
-    # if there are no players with matching positions, return the original solution
+    # if there are no players with matching positions, the mutation fails
     if not possible_pairs:
-        return solution
+        return None
 
     # randomly select one valid pair of players to swap
     i1, i2 = random.choice(possible_pairs)
-    players1[i1], players2[i2] = players2[i2], players1[i1]
+    return [(t1, i1, t2, i2)]
 
-    # validate both teams after the swap
-    if new_repr[t1].is_valid() and new_repr[t2].is_valid():
-        # recreate the solution with the updated representation
-        final_solution = solution.__class__(repr=new_repr)
-        if is_unique(final_solution):
-            return final_solution
-    return solution
+def mutate_random_position_swap(self, solution):
+    return _mutate_with(propose_random_position_swap, solution)
 
 #this function is another layer of protection from players being the same in various teams, just to be safe
 def is_unique(solution):
     all_names = [p['Name'] for team in solution.repr for p in team.players]
     return len(all_names) == len(set(all_names)) #garantees a players doesnt show up in more than one team
 
-
-
+# move proposer of each mutation operator, used by the GA loop to mutate children in place
+INPLACE_MUTATION = {
+    mutate_swap_between_teams: propose_swap_between_teams,
+    mutate_global_position_permutation: propose_global_position_permutation,
+    mutate_random_position_swap: propose_random_position_swap,
+}
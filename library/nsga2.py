@@ -0,0 +1,213 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from library import fixed_para
+from library.compact import encode_population, evaluate_population
+from library.fitness_cache import canonical_keys
+from library.GA import GeneticAlgorithm, _seed_run
+from library.selection import tournament_selection_indices
+from library.termination import MAX_GENERATIONS
+
+'''
+Multi-objective mode (NSGA-II): instead of folding balance and budget into one fitness with a fixed penalty
+weight, a run keeps the trade-off front between three objectives, all minimized:
+ - skill_std: standard deviation of the average team skills (the balance term of FootballSolution.fitness)
+ - overspend: total salary above MAX_BUDGET over all teams (the penalty term, without its 0.5 weight)
+ - salary_spread: standard deviation of the team salaries
+Parents are picked by binary tournament on (front rank, crowding distance), the offspring are made with the
+usual crossover and mutation operators, and parents + offspring are cut back to pop_size by front and
+crowding (clones last, or a converged front fills the population with copies of one league). Non-dominated sorting and crowding distance work on the (n, 3) objective matrix in NumPy.
+weighted_fitness() recovers the scalar fitness of any penalty weight from the front, so one run replaces
+a grid over weights.
+'''
+
+OBJECTIVES = ("skill_std", "overspend", "salary_spread")
+
+# result of a multi-objective run: the distinct non-dominated leagues of the last population and their
+# (n, 3) objectives (OBJECTIVES order), the best scalar fitness per generation and why the run stopped
+ParetoResult = namedtuple("ParetoResult", ["front", "objectives", "history", "stop_reason"])
+
+
+def population_objectives(cube, table=None):
+    """
+    (pop_size, 3) objectives of a (pop_size, N_TEAMS, TEAM_SIZE) id array, and the scalar fitness of every league.
+    """
+    fitness, salaries, skill_sums = evaluate_population(cube, table, return_team_stats=True)
+    objectives = np.column_stack([np.std(skill_sums / fixed_para.TEAM_SIZE, axis=1),
+                                  np.maximum(salaries - fixed_para.MAX_BUDGET, 0).sum(axis=1),
+                                  np.std(salaries, axis=1)])
+    return objectives, fitness, salaries, skill_sums
+
+
+def weighted_fitness(objectives, penalty_weight=0.5):
+    """
+    Scalar fitness of objective rows for a budget penalty weight (0.5 gives FootballSolution.fitness()).
+    """
+    objectives = np.asarray(objectives)
+    return np.maximum(0.001, 1 / (1 + objectives[..., 0]) - penalty_weight * objectives[..., 1])
+
+
+def dominance_matrix(objectives):
+    """
+    [i, j] is True when row i dominates row j (no worse in every objective, better in at least one).
+    """
+    a = objectives[:, None, :]
+    b = objectives[None, :, :]
+    return (a <= b).all(axis=2) & (a < b).any(axis=2)
+
+
+def non_dominated_sort(objectives):
+    """
+    Front rank of every row (0: non-dominated, 1: dominated only by front 0...), peeling the fronts
+    with the domination counts of the dominance matrix.
+    """
+    dominates = dominance_matrix(np.asarray(objectives))
+    n_dominators = dominates.sum(axis=0)
+    rank = np.empty(len(n_dominators), dtype=np.intp)
+    front = np.flatnonzero(n_dominators == 0)
+    r = 0
+    while front.size:
+        rank[front] = r
+        n_dominators -= dominates[front].sum(axis=0)
+        n_dominators[front] = -1 #already ranked
+        front = np.flatnonzero(n_dominators == 0)
+        r += 1
+    return rank
+
+
+def crowding_distance(objectives):
+    """
+    Crowding distance of the rows of one front: sum over objectives of the normalized gap between the two
+    neighbours; the extreme rows of every objective get inf.
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    n = len(objectives)
+    if n <= 2:
+        return np.full(n, np.inf)
+    order = np.argsort(objectives, axis=0, kind="stable")
+    ranked = np.take_along_axis(objectives, order, axis=0)
+    span = ranked[-1] - ranked[0]
+    gaps = (ranked[2:] - ranked[:-2]) / np.where(span > 0, span, 1)
+    distance = np.zeros(n)
+    np.add.at(distance, order[1:-1], gaps)
+    distance[order[0]] = np.inf
+    distance[order[-1]] = np.inf
+    return distance
+
+
+def crowded_order(objectives):
+    """
+    Rows sorted best first by (front rank, -crowding distance), with the rank and crowding of every row.
+    """
+    rank = non_dominated_sort(objectives)
+    crowding = np.empty(len(rank))
+    for r in range(rank.max() + 1 if len(rank) else 0):
+        members = np.flatnonzero(rank == r)
+        crowding[members] = crowding_distance(objectives[members])
+    return np.lexsort((-crowding, rank)), rank, crowding
+
+
+class NSGA2(GeneticAlgorithm):
+    """
+    NSGA-II over the same crossover / mutation operators as GeneticAlgorithm (two_children as there).
+    The per-generation records and history report the scalar fitness (penalty weight 0.5) of the population,
+    so callbacks and termination policies work as in the single-objective loop; run() returns a ParetoResult.
+    """
+    def __init__(self, crossover_func, mutation_func, two_children=False, generations=100, pop_size=40,
+                 crossover_prob=0.9, mutation_prob=0.1, init_method="random",
+                 callbacks=(), termination=(), track_diversity=False):
+        super().__init__(None, crossover_func, mutation_func, two_children, generations, pop_size,
+                         elitism=False, crossover_prob=crossover_prob, mutation_prob=mutation_prob,
+                         init_method=init_method, callbacks=callbacks, termination=termination,
+                         track_diversity=track_diversity)
+        self.objectives = None #objectives of the current population
+        self.rank = None #front rank of the current population
+
+    def evaluate_objectives(self, population):
+        #also fills every individual's fitness cache, as population_fitness does
+        objectives, fitness, salaries, skill_sums = population_objectives(encode_population(population))
+        for ind, fit, team_salaries, team_skill_sums in zip(population, fitness, salaries, skill_sums):
+            ind.set_evaluation(fit, team_salaries.tolist(), team_skill_sums.tolist())
+        return objectives, fitness
+
+    def select_parents(self, population, score, n_pairs):
+        """
+        Crowded binary tournaments: score is higher for a lower rank, then for a larger crowding distance.
+        """
+        idx = tournament_selection_indices(score, 2 * n_pairs, k=2)
+        return [(population[i], population[j]) for i, j in idx.reshape(-1, 2)]
+
+    def _rank(self, objectives):
+        order, rank, crowding = crowded_order(objectives)
+        score = np.empty(len(order))
+        score[order] = np.arange(len(order), 0, -1)
+        return order, rank, score
+
+    def survivors(self, union, objectives):
+        """
+        Indices of the pop_size individuals kept from parents + offspring: best fronts first, then the least
+        crowded. Clones (same canonical form) only come after every distinct league, so they can't crowd out the front.
+        """
+        seen = set()
+        distinct, clones = [], []
+        for i, key in enumerate(canonical_keys(encode_population(union))):
+            (clones if key in seen else distinct).append(i)
+            seen.add(key)
+        distinct = np.array(distinct)
+        keep = distinct[crowded_order(objectives[distinct])[0]]
+        return np.concatenate([keep, clones]).astype(np.intp)[:self.pop_size]
+
+    def _evolve(self, seed, run_id):
+        _seed_run(seed)
+        self.stop_reason = MAX_GENERATIONS
+        for policy in self.termination:
+            policy.reset()
+        population = self.initial_population()
+        objectives, fitness = self.evaluate_objectives(population)
+        _, rank, score = self._rank(objectives)
+        self.objectives, self.rank = objectives, rank
+        evaluations = len(population)
+        yield None, population, fitness
+
+        for gen in range(self.generations):
+            start = time.perf_counter()
+            offspring = self.next_generation(population, score)
+            offspring_objectives, offspring_fitness = self.evaluate_objectives(offspring)
+            evaluations += len(offspring)
+
+            union = population + offspring
+            objectives = np.vstack([objectives, offspring_objectives])
+            fitness = np.concatenate([fitness, offspring_fitness])
+            keep = self.survivors(union, objectives)
+            population = [union[i] for i in keep]
+            objectives, fitness = objectives[keep], fitness[keep]
+            _, rank, score = self._rank(objectives)
+            self.objectives, self.rank = objectives, rank
+
+            record = self._record(run_id, gen, population, fitness, time.perf_counter() - start, evaluations)
+            for callback in self.callbacks:
+                callback(record)
+            yield record, population, fitness
+
+            reason = next((r for r in (policy.check(record) for policy in self.termination) if r), None)
+            if reason is not None:
+                self.stop_reason = reason
+                break
+
+    def run(self, seed=None, run_id=0):
+        """
+        One NSGA-II run. Returns a ParetoResult with the distinct leagues of the final non-dominated front.
+        """
+        history = []
+        for record, population, fitness in self._evolve(seed, run_id):
+            if record is not None:
+                history.append(fitness.max())
+        keys = canonical_keys(encode_population(population))
+        front, seen = [], set()
+        for i in np.flatnonzero(self.rank == 0):
+            if keys[i] not in seen:
+                seen.add(keys[i])
+                front.append(i)
+        return ParetoResult([population[i] for i in front], self.objectives[front], history, self.stop_reason)
@@ -0,0 +1,144 @@
+import csv
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+'''
+Opt-in instrumentation of GA runs: wall time and call counts per phase (initialization, selection,
+crossover, mutation, fitness, elitism, local search, diversity) for every generation of every run, plus event counters
+(fitness cache hits/misses, copies, rejected mutations...).
+When profiling is off the engine uses NULL_PROFILER, whose methods do nothing, and the counters
+in the hot paths only cost a check of the module-level ACTIVE profiler.
+'''
+
+PHASES = ("initialization", "selection", "crossover", "mutation", "fitness", "elitism", "local_search", "diversity")
+INIT_GENERATION = -1 #generation label of the initialization phase
+
+ACTIVE = None #profiler of the run in progress (one per process), None when profiling is off
+
+
+def count(name, n=1):
+    """
+    Adds n to a counter of the active profiler (no-op when profiling is off).
+    """
+    if ACTIVE is not None:
+        ACTIVE.count(name, n)
+
+
+class GAProfiler:
+    """
+    Collects phase timings and counters, keyed by (run, generation).
+    """
+    def __init__(self, run=0):
+        self.run = run
+        self.generation = INIT_GENERATION
+        self.seconds = defaultdict(float) #(run, generation, phase) -> seconds
+        self.calls = defaultdict(int) #(run, generation, phase) -> calls
+        self.counters = defaultdict(int) #(run, generation, counter) -> value
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    @contextmanager
+    def phase(self, name):
+        key = (self.run, self.generation, name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[key] += time.perf_counter() - start
+            self.calls[key] += 1
+
+    def count(self, name, n=1):
+        self.counters[(self.run, self.generation, name)] += n
+
+    @contextmanager
+    def activate(self):
+        #makes this profiler receive the counters of the hot paths (fitness cache, copies...)
+        global ACTIVE
+        previous, ACTIVE = ACTIVE, self
+        try:
+            yield self
+        finally:
+            ACTIVE = previous
+
+    def rows(self):
+        """
+        Flat records: one per (run, generation, phase) and one per (run, generation, counter).
+        """
+        rows = [{"run": run, "generation": gen, "kind": "phase", "name": name,
+                 "seconds": self.seconds[(run, gen, name)], "calls": self.calls[(run, gen, name)]}
+                for run, gen, name in sorted(self.seconds)]
+        rows += [{"run": run, "generation": gen, "kind": "counter", "name": name,
+                  "seconds": None, "calls": value}
+                 for (run, gen, name), value in sorted(self.counters.items())]
+        return rows
+
+    def totals(self):
+        """
+        Totals over all generations: {"phases": {phase: {"seconds", "calls"}}, "counters": {name: value}}.
+        """
+        phases = defaultdict(lambda: {"seconds": 0.0, "calls": 0})
+        for (run, gen, name), seconds in self.seconds.items():
+            phases[name]["seconds"] += seconds
+            phases[name]["calls"] += self.calls[(run, gen, name)]
+        counters = defaultdict(int)
+        for (run, gen, name), value in self.counters.items():
+            counters[name] += value
+        return {"phases": dict(phases), "counters": dict(counters)}
+
+    def merge(self, other):
+        for key, value in other.seconds.items():
+            self.seconds[key] += value
+        for key, value in other.calls.items():
+            self.calls[key] += value
+        for key, value in other.counters.items():
+            self.counters[key] += value
+        return self
+
+    def report(self):
+        return {"totals": self.totals(), "records": self.rows()}
+
+    def to_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def to_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["run", "generation", "kind", "name", "seconds", "calls"])
+            writer.writeheader()
+            writer.writerows(self.rows())
+
+
+class _NullProfiler:
+    """
+    Does nothing, used when profiling is off.
+    """
+    _null = nullcontext()
+
+    def start_generation(self, generation):
+        pass
+
+    def phase(self, name):
+        return self._null
+
+    def count(self, name, n=1):
+        pass
+
+    def activate(self):
+        return self._null
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def merge_profiles(profiles):
+    """
+    Merges the profilers of several runs (e.g. the GAResult.profile of run_many) into one.
+    """
+    merged = GAProfiler()
+    for profile in profiles:
+        if profile is not None:
+            merged.merge(profile)
+    return merged
@@ -0,0 +1,138 @@
+import csv
+import ast
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+'''
+Compact binary store for grid-search results, replacing the CSVs with one stringified list per cell.
+A result set is a directory:
+    fitness.npy  float64 cube of shape (n_combinations, n_runs, n_generations)
+    seeds.npy    uint64 array (n_combinations, n_runs), the seed of every run (0 when unknown)
+    meta.json    combination labels, operator choices of each combination, fixed parameters...
+The .npy files are opened memory-mapped, so loading a grid takes milliseconds and only the slices
+that are actually used are read from disk.
+'''
+
+FITNESS_FILE = "fitness.npy"
+SEEDS_FILE = "seeds.npy"
+META_FILE = "meta.json"
+
+
+def _jsonable(value):
+    #functions and other objects are stored by name
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return getattr(value, "__name__", repr(value))
+
+
+class GridResults:
+    """
+    Fitness cube of a grid search plus its metadata.
+    """
+    def __init__(self, fitness, labels, seeds=None, combinations=None, params=None, meta=None):
+        self.fitness = fitness
+        self.labels = list(labels)
+        if len(self.labels) != fitness.shape[0]:
+            raise ValueError("There must be one label per combination")
+        self.seeds = seeds if seeds is not None else np.zeros(fitness.shape[:2], dtype=np.uint64)
+        self.combinations = combinations or [{} for _ in self.labels]
+        self.params = params or {}
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def n_runs(self):
+        return self.fitness.shape[1]
+
+    @property
+    def n_generations(self):
+        return self.fitness.shape[2]
+
+    def __getitem__(self, label):
+        """
+        (n_runs, n_generations) fitness of one combination.
+        """
+        return self.fitness[self.labels.index(label)]
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, FITNESS_FILE), np.asarray(self.fitness, dtype=np.float64))
+        np.save(os.path.join(path, SEEDS_FILE), np.asarray(self.seeds, dtype=np.uint64))
+        meta = dict(self.meta)
+        meta.update({
+            "labels": self.labels,
+            "combinations": _jsonable(self.combinations),
+            "params": _jsonable(self.params),
+            "shape": {"combinations": len(self.labels), "runs": self.n_runs, "generations": self.n_generations},
+            "saved": datetime.now(timezone.utc).isoformat(),
+        })
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Opens a saved result set. With mmap (default) the arrays are memory-mapped read-only.
+        """
+        mode = "r" if mmap else None
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(np.load(os.path.join(path, FITNESS_FILE), mmap_mode=mode),
+                   meta.pop("labels"),
+                   np.load(os.path.join(path, SEEDS_FILE), mmap_mode=mode),
+                   meta.pop("combinations"), meta.pop("params"), meta)
+
+    @classmethod
+    def from_runs(cls, results, seeds=None, combinations=None, params=None):
+        """
+        Builds the cube from {label: [history of run 0, ..., history of run n-1]} (what run_grid_search returns).
+        seeds: optional {label: [seed of each run]}.
+        """
+        labels = list(results)
+        fitness = np.array([results[label] for label in labels], dtype=np.float64)
+        seed_array = None
+        if seeds is not None:
+            seed_array = np.array([seeds[label] for label in labels], dtype=np.uint64)
+        return cls(fitness, labels, seed_array, combinations, params)
+
+    def medians(self):
+        """
+        DataFrame (generation x combination) of the median fitness over runs.
+        """
+        return pd.DataFrame(np.median(self.fitness, axis=1).T, columns=self.labels)
+
+    def to_frame(self):
+        """
+        Same layout as the old ga_grid_search_results.csv once parsed: one row per generation, one column per
+        combination, each cell the list of the values of every run. Meant for existing analysis code only.
+        """
+        return pd.DataFrame({label: self.fitness[c].T.tolist() for c, label in enumerate(self.labels)})
+
+
+def save_results(path, results, seeds=None, combinations=None, params=None):
+    GridResults.from_runs(results, seeds, combinations, params).save(path)
+
+
+def load_results(path, mmap=True):
+    return GridResults.load(path, mmap)
+
+
+def convert_legacy_csv(csv_path, path):
+    """
+    Converts an old stringified-list CSV (rows = generations, cells = list of run values) into a result set.
+    """
+    df = pd.read_csv(csv_path, quoting=csv.QUOTE_NONNUMERIC)
+    fitness = np.array([[ast.literal_eval(cell) for cell in df[col]] for col in df.columns], dtype=np.float64)
+    results = GridResults(fitness.transpose(0, 2, 1), list(df.columns), meta={"converted_from": os.path.basename(csv_path)})
+    results.save(path)
+    return results
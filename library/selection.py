@@ -1,11 +1,17 @@
 import random
+import numpy as np
 from copy import deepcopy
+from library.compact import numpy_rng
+from library import profiling
+
 def tournament_selection(population, k=5):
     # randomly sample k individuals from the population
     # select the one with the highest fitness among them
+    profiling.count("deep_copies")
     return deepcopy(max(random.sample(population, k), key=lambda s: s.fitness()))
 
 def fitness_proportionate_selection(population):
+    profiling.count("deep_copies")
     fitness_values = [ind.fitness() for ind in population]
     total_fitness = sum(fitness_values)
     if total_fitness == 0:
@@ -21,3 +27,33 @@ def fitness_proportionate_selection(population):
         cumulative += fit
         if rand <= cumulative:
             return deepcopy(ind)
+
+
+'''
+Batch versions: they work on the fitness array of the whole population (computed once per generation)
+and return the indices of n parents, without copying anyone. Callers only copy a parent when
+they are about to modify it.
+'''
+def tournament_selection_indices(fitness, n, k=5, rng=None):
+    # all n tournaments drawn in one call: k distinct contestants each (as random.sample), best one wins
+    fitness = np.asarray(fitness)
+    rng = rng if rng is not None else numpy_rng()
+    contestants = np.argpartition(rng.random((n, len(fitness))), k - 1, axis=1)[:, :k]
+    return contestants[np.arange(n), np.argmax(fitness[contestants], axis=1)]
+
+def fitness_proportionate_selection_indices(fitness, n, rng=None):
+    fitness = np.asarray(fitness, dtype=float)
+    rng = rng if rng is not None else numpy_rng()
+    cumulative = np.cumsum(fitness)
+    if cumulative[-1] == 0:
+        # if all individuals have zero fitness, pick at random
+        return rng.integers(0, len(fitness), n)
+    # first individual whose cumulative fitness reaches each spin (same rule as the loop above)
+    spins = rng.uniform(0, cumulative[-1], n)
+    return np.minimum(np.searchsorted(cumulative, spins, side='left'), len(fitness) - 1)
+
+# batch counterpart of each selection operator, used by the GA loop when available
+BATCH_SELECTION = {
+    tournament_selection: tournament_selection_indices,
+    fitness_proportionate_selection: fitness_proportionate_selection_indices,
+}
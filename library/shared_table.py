@@ -0,0 +1,102 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from library import compact, fixed_para
+from library.compact import PlayerTable, get_player_table
+
+'''
+Player table published once in a multiprocessing shared memory block, so pool workers attach to it
+instead of each loading and parsing the dataset. The block holds contiguous arrays (position code,
+skill, salary, name, position); an attached worker builds its PlayerTable directly over them (zero-copy, read-only)
+and installs it as its default dataset. Together with FootballSolution pickling only player ids, individuals sent
+between processes carry 35 small ints instead of a reference to players_df.
+Scope: the block saves the per-worker loading and parsing and the pickling of the dataset, not its per-worker
+memory for the FootballSolution GA. A FootballSolution holds player dicts and players_df, so a worker running
+GeneticAlgorithm (run_ga, grid searches, islands) builds its own copies of both on first use; only workers that
+stay on the compact path (CompactSolution, id arrays, evaluate_population) run on the shared arrays alone.
+
+    with SharedPlayerTable() as shared:
+        with ProcessPoolExecutor(initializer=attach_player_table, initargs=(shared.handle,)) as pool:
+            ...
+'''
+
+NAME_DTYPE = np.dtype("U64")
+POSITION_DTYPE = np.dtype("U16")
+_FIELDS = (("position_code", np.dtype(np.int8)), ("skill", np.dtype(np.float64)),
+           ("salary", np.dtype(np.float64)), ("name", NAME_DTYPE), ("position", POSITION_DTYPE))
+
+_attached = None #shared memory block this process is attached to (kept open while in use)
+
+
+def _layout(n_players):
+    #offset of each array in the block (8-byte aligned) and total size
+    offsets, offset = {}, 0
+    for name, dtype in _FIELDS:
+        offset = -(-offset // 8) * 8
+        offsets[name] = offset
+        offset += n_players * dtype.itemsize
+    return offsets, offset
+
+
+def _views(buffer, n_players):
+    offsets, size = _layout(n_players)
+    return {name: np.ndarray((n_players,), dtype=dtype, buffer=buffer, offset=offsets[name]) for name, dtype in _FIELDS}
+
+
+class SharedPlayerTable:
+    """
+    Owner of the shared block: copies a PlayerTable (default: the shared table of this process) into it.
+    `handle` is the small picklable value workers need to attach. The block is freed by close() / on exit.
+    """
+    def __init__(self, table=None):
+        table = table if table is not None else get_player_table()
+        n_players = len(table)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(_layout(n_players)[1], 1))
+        views = _views(self._shm.buf, n_players)
+        views["position_code"][:] = table.position_code
+        views["skill"][:] = table.skill
+        views["salary"][:] = table.salary
+        views["name"][:] = table.names
+        views["position"][:] = table.position
+        del views #no exported buffers may be left when the block is closed
+        self.handle = (self._shm.name, n_players)
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_player_table(handle):
+    """
+    Pool initializer: maps the shared block and makes it this process's dataset (fixed_para.get_players_df()
+    and the compact default table). Returns the attached PlayerTable.
+    Only the numeric arrays are shared: the player dicts and players_df are built in the worker, and only
+    when dict-based code first needs them (any FootballSolution does, compact-only work never).
+    """
+    global _attached
+    name, n_players = handle
+    shm = shared_memory.SharedMemory(name=name)
+    views = _views(shm.buf, n_players)
+    for view in views.values():
+        view.flags.writeable = False
+    table = PlayerTable.from_arrays(views["name"], views["position"], views["position_code"], views["skill"],
+                                    views["salary"])
+
+    def build_players_df():
+        players_df = table.to_frame()
+        compact.set_default_table(table, players_df)
+        return players_df
+
+    fixed_para.use_players_df(build_players_df)
+    compact.set_default_table(table, build_players_df)
+    _attached = shm
+    return table
@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+import os
+
+'''
+Recorders that append the per-generation records of a GA run (GA.GenerationRecord) to disk as soon
+as each generation is done, so long runs and grids can be monitored live (e.g. `tail -f`) and nothing
+has to stay in memory until the end. Use them as GeneticAlgorithm callbacks.
+Each record is written with a single write() on a file opened in append mode and flushed, so several
+processes can share the same file (one complete line per record). The file is opened lazily, so the
+recorders can be pickled and sent to pool workers.
+'''
+
+
+class _AppendRecorder:
+    def __init__(self, path, tags=None):
+        self.path = path
+        self.tags = dict(tags or {}) #extra fields added to every record (e.g. the grid combination), they win over the record ones
+        self._file = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_file"] = None
+        return state
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", newline="", encoding="utf-8")
+        return self._file
+
+    def _fields(self, record):
+        return {**record._asdict(), **self.tags}
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __del__(self):
+        self.close()
+
+
+class JsonlRecorder(_AppendRecorder):
+    """
+    Appends every record as one JSON line.
+    """
+    def __call__(self, record):
+        f = self._open()
+        f.write(json.dumps(self._fields(record)) + "\n")
+        f.flush()
+
+
+class CsvRecorder(_AppendRecorder):
+    """
+    Appends every record as one CSV row (the header is written when the file is new).
+    """
+    def __call__(self, record):
+        fields = self._fields(record)
+        new_file = self._file is None and (not os.path.exists(self.path) or os.path.getsize(self.path) == 0)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if new_file:
+            writer.writerow(fields)
+        writer.writerow(fields.values())
+        f = self._open()
+        f.write(buffer.getvalue())
+        f.flush()
+
+
+def read_records(path):
+    """
+    Reads back the records of a JsonlRecorder file (a truncated last line is ignored).
+    """
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
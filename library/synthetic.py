@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from library import fixed_para
+
+'''
+Synthetic players tables, to benchmark the GA on leagues larger than the 35-player dataset.
+The columns are those of data/players(in).csv. Skills are drawn around the real ones (mean 86, sd 4,
+integers in [70, 99]) and salaries grow with skill like in the real data (about +5M per skill point)
+with some noise, but 10M cheaper (80M at skill 85): the penalty is summed over teams, so with the real
+prices large leagues would almost always have some team over the 750M budget.
+'''
+
+
+def generate_players(n_teams=None, team_structure=None, surplus=1.0, seed=None):
+    """
+    Random players table with enough players of each position for n_teams teams of team_structure
+    (default: the current problem, see fixed_para.set_problem) times `surplus`:
+    1.0 is exactly one league's worth, 10.0 a pool ten times larger than the demand.
+    """
+    n_teams = n_teams if n_teams is not None else fixed_para.N_TEAMS
+    team_structure = team_structure if team_structure is not None else fixed_para.TEAM_STRUCTURE
+    if surplus < 1:
+        raise ValueError("surplus must be at least 1 (the pool must fill the league)")
+    rng = np.random.default_rng(seed)
+
+    positions = np.concatenate([[pos] * math.ceil(n_teams * count * surplus) for pos, count in team_structure.items()])
+    n_players = len(positions)
+    skill = np.clip(np.rint(rng.normal(86, 4, n_players)), 70, 99)
+    salary = np.maximum(np.rint(80 + 5 * (skill - 85) + rng.normal(0, 4, n_players)), 30)
+    return pd.DataFrame({
+        "Name": [f"Player {i}" for i in range(n_players)],
+        "Position": positions,
+        "Skill": skill.astype(int),
+        "Salary (€M)": salary.astype(int),
+    })
+
+
+def write_players_csv(path, n_teams=None, team_structure=None, surplus=1.0, seed=None):
+    """
+    Writes a synthetic table in the format of data/players(in).csv (usable with fixed_para.set_players_path).
+    """
+    df = generate_players(n_teams, team_structure, surplus, seed)
+    df.to_csv(path)
+    return df
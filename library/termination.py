@@ -0,0 +1,89 @@
+import time
+
+'''
+Termination policies for the GA loop. By default a run lasts exactly `generations` generations; any of these
+can be passed to GeneticAlgorithm(termination=[...]) to stop it earlier. They are checked after every
+generation with its GenerationRecord, the first one that triggers ends the run and its reason is stored in
+GAResult.stop_reason ("max_generations" when none triggered).
+'''
+
+MAX_GENERATIONS = "max_generations"
+
+
+class TerminationPolicy:
+    """
+    Base class: reset() is called at the start of every run, check(record) returns a reason (str) to stop or None.
+    """
+    def reset(self):
+        pass
+
+    def check(self, record):
+        raise NotImplementedError
+
+
+class MaxEvaluations(TerminationPolicy):
+    """
+    Stops once the number of fitness evaluations (initial population included) reaches the budget,
+    so different configurations can be compared at equal cost.
+    """
+    def __init__(self, budget):
+        self.budget = budget
+
+    def check(self, record):
+        if record.evaluations >= self.budget:
+            return "max_evaluations"
+        return None
+
+
+class Stagnation(TerminationPolicy):
+    """
+    Stops when the best fitness has not improved by more than `tolerance` for `generations` generations.
+    """
+    def __init__(self, generations, tolerance=0.0):
+        self.generations = generations
+        self.tolerance = tolerance
+        self.reset()
+
+    def reset(self):
+        self._best = None
+        self._since = 0
+
+    def check(self, record):
+        if self._best is None or record.best > self._best + self.tolerance:
+            self._best = record.best
+            self._since = 0
+            return None
+        self._since += 1
+        if self._since >= self.generations:
+            return "stagnation"
+        return None
+
+
+class TargetFitness(TerminationPolicy):
+    """
+    Stops as soon as the best fitness reaches the target (e.g. 1.0, perfectly balanced teams within budget).
+    """
+    def __init__(self, target):
+        self.target = target
+
+    def check(self, record):
+        if record.best >= self.target:
+            return "target_fitness"
+        return None
+
+
+class WallClock(TerminationPolicy):
+    """
+    Stops once the run has lasted `seconds` (checked at the end of each generation).
+    """
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.reset()
+
+    def reset(self):
+        self._start = time.perf_counter()
+
+    def check(self, record):
+        if time.perf_counter() - self._start >= self.seconds:
+            return "wall_clock"
+        return None
@@ -4,15 +4,11 @@ from library.crossover import crossover_blockwise_teams, crossover_position_base
 from library.crossover2child import crossover_blockwise_teams_two_offspring, crossover_position_based_two_offspring
 
 from library.mutation import mutate_global_position_permutation, mutate_random_position_swap, mutate_swap_between_teams
-from library.classes import FootballSolution, Team
-from library.GA import run_ga_test_single_child, run_ga_test_two_children
+from library.grid_search import run_grid_search, grid_combinations
 
 import random
 import numpy as np
-from copy import deepcopy
-import csv
 import pandas as pd
-from itertools import product
 
 
 # ------------------ Operators ------------------ #
@@ -21,14 +17,11 @@ selection_methods = {
     "fitness_proportionate": fitness_proportionate_selection
 }
 
-crossover_methods_single_child = {
-    "blockwise": crossover_blockwise_teams,
-    "positionbased": crossover_position_based
-}
-
-crossover_methods_two_children = {
-    "blockwise_2child": crossover_blockwise_teams_two_offspring,
-    "positionbased_2child": crossover_position_based_two_offspring
+crossover_methods = {
+    "blockwise": {"crossover_func": crossover_blockwise_teams, "two_children": False},
+    "positionbased": {"crossover_func": crossover_position_based, "two_children": False},
+    "blockwise_2child": {"crossover_func": crossover_blockwise_teams_two_offspring, "two_children": True},
+    "positionbased_2child": {"crossover_func": crossover_position_based_two_offspring, "two_children": True}
 }
 
 mutation_methods = {
@@ -37,54 +30,47 @@ mutation_methods = {
     "between_teams": mutate_swap_between_teams
 }
 
-# ------------------ Combinations ------------------ #
-all_xo_mut_combinations = list(product(
-    list(crossover_methods_single_child.items()) + list(crossover_methods_two_children.items()),
-    mutation_methods.items()
-))
-xo_mut_comb_sample = random.sample(all_xo_mut_combinations, 6) #decided to go with only 6 to run in an effective time
-
-selection_combs = []
-for sel_name, sel_func in selection_methods.items():
-    for (c_name, c_func), (m_name, m_func) in xo_mut_comb_sample:
-        ga_runner = run_ga_test_two_children if "2child" in c_name else run_ga_test_single_child
-        selection_combs.append((sel_name, sel_func, c_name, c_func, m_name, m_func, ga_runner))
-
-
+operator_grid = {
+    "selection_func": selection_methods,
+    "crossover": crossover_methods,
+    "mutation_func": mutation_methods,
+    "elitism": {"elitism=True": True},
+}
 
 # ------------------ Fixed Parameters ------------------ #
-generations = 100
-pop_size = 40
+fixed_params = {
+    "generations": 100,
+    "pop_size": 40,
+    "crossover_prob": 0.9,
+    "mutation_prob": 0.1,
+}
 n_runs = 30
-crossover_prob = 0.9
-mutation_prob = 0.1
+n_jobs = -1 #all cores
+seed = 2025
+checkpoint = 'ga_selection_checkpoint.jsonl' #delete it to start the grid from scratch
+results_path = 'ga_selection_results' #full fitness cube (the CSV below only keeps the medians)
 
+# ------------------ Combinations ------------------ #
+#decided to go with only 6 crossover x mutation pairs to run in an effective time
+#(seeded so that a resumed run picks the same sample as the checkpoint)
+all_xo_mut_combinations = grid_combinations({"crossover": crossover_methods, "mutation_func": mutation_methods})
+xo_mut_comb_sample = random.Random(seed).sample(all_xo_mut_combinations, 6)
 
-results_df = pd.DataFrame()
+selection_combs = [{"selection_func": sel_name, **xo_mut, "elitism": "elitism=True"}
+                   for sel_name in selection_methods for xo_mut in xo_mut_comb_sample]
 
 
 # ------------------ Grid Search ------------------ #
-for sel_name, sel_func, c_name, c_func, m_name, m_func, ga_runner in selection_combs:
-    combination_name = f'{sel_name}|{c_name}|{m_name}|elitism=True'
-    print(f"\nRunning {combination_name} ...")
-
-    all_runs = ga_runner(
-        sel_func, c_func, m_func,
-        generations=generations,
-        pop_size=pop_size,
-        n_runs=n_runs,
-        elitism=True,
-        crossover_prob=crossover_prob,
-        mutation_prob=mutation_prob
-    )
-
-    medians = np.median(np.transpose(all_runs), axis=1)
-    results_df[combination_name] = medians
-
-# ------------------ Results ------------------ #
-results_df.to_csv('ga_selection_analysis.csv')
-print("\nResults saved 'ga_selection_analysis.csv'")
-
-
-
-
+if __name__ == "__main__":
+    results = run_grid_search(operator_grid, n_runs=n_runs, fixed_params=fixed_params,
+                              combinations=selection_combs, checkpoint_path=checkpoint,
+                              n_jobs=n_jobs, seed=seed, store_path=results_path)
+
+    results_df = pd.DataFrame()
+    for combination_name, all_runs in results.items():
+        medians = np.median(np.transpose(all_runs), axis=1)
+        results_df[combination_name] = medians
+
+    # ------------------ Results ------------------ #
+    results_df.to_csv('ga_selection_analysis.csv')
+    print("\nResults saved 'ga_selection_analysis.csv'")